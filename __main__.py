@@ -1,11 +1,17 @@
-from blessed import Terminal
+from __future__ import annotations
+
 import argparse
+import asyncio
+from collections import deque
+import sys
+from typing import TYPE_CHECKING
 import unicodedata
-from maze import Maze, Player, Size, Theme, DEFAULT_THEME
+from maze import Maze, World, Player, Size, Theme, DEFAULT_THEME, FrameRenderer, Camera, profiling
 
-terminal = Terminal()
+if TYPE_CHECKING:
+    from blessed import Terminal
+    from maze.parallel import ProgressiveGenerator
 
-maze = Maze(Size((terminal.width // 4) - terminal.width % 2, (terminal.height // 2) - terminal.height % 2 + 2))
 key_to_cardinal = {
     "W": "N",
     "A": "W",
@@ -27,7 +33,198 @@ def to_string(chars):
     return ret
 
 
-def main(full_render: bool, snap: bool):
+def parse_fps(value: str) -> float:
+    fps = float(value)
+    if not fps > 0:
+        raise argparse.ArgumentTypeError(f"must be above 0, got {value!r}")
+    return fps
+
+
+class Game:
+    """Runs the game loop.
+
+    Keys are read as soon as they arrive and queued. Every frame applies all
+    the queued keys, then renders the latest state once, so frames are
+    skipped when keys arrive faster than they can be rendered. At most
+    ``fps`` frames are rendered per second.
+
+    When a ``generator`` is given, the rest of the maze is generated while
+    the game is played, and every frame shows the tiles added so far.
+    """
+
+    def __init__(
+        self,
+        terminal: Terminal,
+        player: Player,
+        title: str,
+        themes: tuple[Theme, Theme],
+        *,
+        full_render: bool = True,
+        fps: float = 60,
+        generator: ProgressiveGenerator | None = None,
+    ):
+        self.terminal = terminal
+        self.player = player
+        self.title = title
+        self.themes = themes
+        if not fps > 0:
+            raise ValueError(f"The frame rate must be above 0, got {fps}.")
+        self.frame_time = 1 / fps
+        self.compose = player.compose_full if full_render else player.compose
+        self.generator = generator
+
+        # Only the cells that changed are written after every frame.
+        self.renderer = FrameRenderer(move=terminal.move_xy)
+        # Only the part of the maze around the player is drawn, so the maze may be larger than the terminal.
+        maze = player.maze
+        self.camera = Camera(1, 1, bounds=maze._actual_size if isinstance(maze, Maze) else None)
+
+        self.keys: deque[str] = deque()
+        self.wake = asyncio.Event()
+        self.terminal_size: tuple[int, int] | None = None
+        self.header = ""
+        self.full_redraw = True
+        self.footer: str | None = None
+        self.footer_shown = False
+
+    def make_header(self) -> str:
+        terminal = self.terminal
+        db = terminal.white_on_dodgerblue4
+        lb = terminal.black_on_steelblue1
+        return terminal.ljust(
+            terminal.white_on_blue(terminal.center(self.title))
+            + "\n"
+            + "\n".join(
+                db(terminal.ljust(line))
+                for line in terminal.wrap(
+                    f"{lb('WASD')} or arrows to move. {lb('Q')} to quit. This is you: {self.themes[0].player}. "
+                    f"{lb('T')} to toggle theme. {lb('R')} to tgl render mode. {lb('E')} to tgl snap mode."
+                )
+            )
+            + "\n"
+        )
+
+    @property
+    def resized(self) -> bool:
+        return self.terminal_size != (self.terminal.width, self.terminal.height)
+
+    async def read_input(self):
+        """Queues the keys as they arrive, and wakes the loop up for them or for a resize."""
+        while True:
+            # Waits in a thread, with a timeout so resizes are noticed and the task can end.
+            if await asyncio.to_thread(self.terminal.kbhit, 0.1):
+                with profiling.section("frame.input"):
+                    while key := self.terminal.inkey(timeout=0):
+                        self.keys.append(key.upper())
+                self.wake.set()
+            elif self.resized:
+                self.wake.set()
+
+    async def reveal(self):
+        """Adds the tiles of the maze as they are generated, and wakes the loop up to draw them."""
+        assert self.generator is not None
+        async for progress in self.generator.reveal():
+            self.player.invalidate()
+            self.footer = self.terminal.black_on_darkkhaki(self.terminal.center(f"Generating maze... {progress:.0%}"))
+            self.wake.set()
+
+        self.footer = None
+        self.wake.set()
+
+    def apply_keys(self) -> bool:
+        """Applies every queued key. Returns whether the player quit."""
+        themes = self.themes
+        player = self.player
+        profiling.count("keys", len(self.keys))
+
+        while self.keys and not player.won:
+            key = self.keys.popleft()
+            if key == "Q":
+                return True
+
+            self.footer = None
+            if direction := key_to_cardinal.get(key):
+                with profiling.section("frame.move"):
+                    player.move(direction)
+            elif key == "T":
+                player.theme = themes[1] if player.theme == themes[0] else themes[0]
+                self.full_redraw = True
+            elif key == "R":
+                self.compose = player.compose if self.compose == player.compose_full else player.compose_full
+                self.full_redraw = True
+            elif key == "E":
+                player.snap = not player.snap
+            else:
+                self.footer = self.terminal.black_on_red(self.terminal.center(f"Unknown key: {to_string(key)}"))
+
+        return False
+
+    def draw(self):
+        terminal = self.terminal
+        if self.resized:
+            # Lay the screen out again, the game goes on.
+            self.terminal_size = (terminal.width, terminal.height)
+            self.header = self.make_header()
+            self.renderer.origin = (2, self.header.count("\n") + 1)
+            self.camera.resize((terminal.width - 4) // 2, terminal.height - self.renderer.origin[1] - 1)
+            self.full_redraw = True
+
+        if self.full_redraw:
+            print(terminal.home + terminal.clear + self.header)
+            self.renderer.reset()
+            self.full_redraw = False
+            self.footer_shown = False
+
+        with profiling.section("frame.render"):
+            viewport = self.camera.follow(self.player.cell.coord)
+            print(self.renderer.render(self.compose(viewport)), end="", flush=True)
+
+        if self.footer or self.footer_shown:
+            footer_y = self.renderer.origin[1] + viewport.height
+            print(terminal.move_xy(0, footer_y) + terminal.clear_eol + (self.footer or ""), end="", flush=True)
+            self.footer_shown = bool(self.footer)
+
+    async def run(self) -> bool:
+        """Plays until the player wins or quits. Returns whether they won."""
+        loop = asyncio.get_running_loop()
+        reader = asyncio.create_task(self.read_input())
+        revealer = asyncio.create_task(self.reveal()) if self.generator and not self.generator.done else None
+
+        try:
+            while True:
+                frame_start = loop.time()
+                self.draw()
+
+                # Keys that arrive until the next frame are applied together.
+                await asyncio.sleep(max(0.0, frame_start + self.frame_time - loop.time()))
+                await self.wake.wait()
+                self.wake.clear()
+
+                if self.apply_keys():
+                    return False
+                if self.player.won:
+                    return True
+                profiling.count("frames")
+        finally:
+            reader.cancel()
+            if revealer:
+                revealer.cancel()
+
+
+def main(
+    full_render: bool,
+    snap: bool,
+    seed: int | None = None,
+    load: str | None = None,
+    save: str | None = None,
+    size: Size | None = None,
+    infinite: bool = False,
+    fps: float = 60,
+):
+    # Only needed to play, not to read the options.
+    from blessed import Terminal
+    from maze.parallel import ProgressiveGenerator
+
     terminal = Terminal()
 
     print(terminal.home + terminal.clear + terminal.move_y(terminal.height // 2))
@@ -59,81 +256,80 @@ def main(full_render: bool, snap: bool):
         trail=terminal.on_lightskyblue4(DEFAULT_THEME.trail),
     )
 
-    maze = Maze(Size((terminal.width // 4) - 1, (terminal.height // 2) - 2))
-    maze.generate()
-
-    db = terminal.white_on_dodgerblue4
-    lb = terminal.black_on_steelblue1
+    maze: Maze | World
+    generator = None
+    if infinite:
+        maze = World(seed=seed)
+        title = "Maze Game (Infinite)"
+    else:
+        if load:
+            maze = Maze.load(load)
+        else:
+            # Only the tiles around the start are generated now, the rest while playing.
+            maze = Maze(size or Size((terminal.width // 4) - 1, (terminal.height // 2) - 2), compact=True, seed=seed)
+            generator = ProgressiveGenerator()
+            maze.generate(generator)
 
-    original_size = (terminal.width, terminal.height)
-
-    header = terminal.ljust(
-        terminal.white_on_blue(terminal.center(f"Maze Game (Size {maze.size.width}x{maze.size.height})"))
-        + "\n"
-        + "\n".join(
-            db(terminal.ljust(line))
-            for line in terminal.wrap(
-                f"{lb('WASD')} or arrows to move. {lb('Q')} to quit. This is you: {dark_theme.player}. "
-                f"{lb('T')} to toggle theme. {lb('R')} to tgl render mode. {lb('E')} to tgl snap mode."
-            )
-        )
-        + "\n"
-    )
+        if save:
+            if generator:
+                generator.finish()
+            maze.save(save)
+        title = f"Maze Game (Size {maze.size.width}x{maze.size.height})"
 
     with terminal.cbreak(), terminal.hidden_cursor():
         player = Player(maze=maze, theme=dark_theme)
         player.snap = snap
 
-        render_func = player.full_render if full_render else player.render
-
-        print(terminal.home + terminal.clear + header)
-        render_func(lpadding="  ")
-
-        while not player.won:
-            user_input = terminal.inkey().upper()
-
-            if original_size != (terminal.width, terminal.height):
-                print(terminal.home + terminal.clear)
-                print(terminal.white_on_red(terminal.center(" ")))
-                print(terminal.white_on_red(terminal.center("Terminal window was resized. Try again.")))
-                print(terminal.white_on_red(terminal.center(" ")))
-                break
-
-            if user_input == "Q":
-                print(terminal.home + terminal.clear)
-                print(terminal.white_on_red(terminal.center(" ")))
-                print(terminal.white_on_red(terminal.center("You quit.")))
-                print(terminal.white_on_red(terminal.center(" ")))
-                break
-
-            footer = None
-            try:
-                player.move(key_to_cardinal[user_input])
-            except KeyError:
-                if user_input == "T":
-                    player.theme = light_theme if player.theme == dark_theme else dark_theme
-                elif user_input == "R":
-                    render_func = player.render if render_func == player.full_render else player.full_render
-                elif user_input == "E":
-                    player.snap = not player.snap
-                else:
-                    footer = terminal.black_on_red(terminal.center(f"Unknown key: {to_string(user_input)}"))
-
-            render_func(lpadding="  ", console_clear_sequence=terminal.home + terminal.clear + header)
-
-            if footer:
-                print(footer)
+        game = Game(
+            terminal, player, title, (dark_theme, light_theme), full_render=full_render, fps=fps, generator=generator
+        )
+        won = asyncio.run(game.run())
 
-        else:
-            print(terminal.home + terminal.clear)
+        print(terminal.home + terminal.clear)
+        if won:
             print(terminal.black_on_lime(terminal.center(" ")))
             print(terminal.black_on_lime(terminal.center("Congratulations. You won!")))
             print(terminal.black_on_lime(terminal.center(" ")))
+        else:
+            print(terminal.white_on_red(terminal.center(" ")))
+            print(terminal.white_on_red(terminal.center("You quit.")))
+            print(terminal.white_on_red(terminal.center(" ")))
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(prog="MazeGame", description="A fun little maze game")
     parser.add_argument("-pv", "--partial", action="store_false", help="Pass to start in partial visibility mode.")
     parser.add_argument("-s", "--snap", action="store_true", help="Pass to start with snap movement mode.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the maze, to play the same maze again.")
+    parser.add_argument("--load", help="Play a maze saved with --save instead of generating one.")
+    parser.add_argument("--save", help="Save the maze to this file.")
+    parser.add_argument("--size", type=Size.parse, help="Maze size as WIDTHxHEIGHT tiles. Defaults to the terminal size.")
+    parser.add_argument("--infinite", action="store_true", help="Play an endless maze instead.")
+    parser.add_argument("--fps", type=parse_fps, default=60, help="The most frames rendered per second. Defaults to 60.")
+    parser.add_argument(
+        "--profile", nargs="?", const="profile.json", help="Write timings to this JSON file on exit (profile.json)."
+    )
     flags = parser.parse_args()
-    main(full_render=flags.partial, snap=flags.snap)
+
+    profiler = None
+    if flags.profile:
+        profiler = profiling.Profiler()
+        profiling.add_hook(profiler)
+
+    try:
+        main(
+            full_render=flags.partial,
+            snap=flags.snap,
+            seed=flags.seed,
+            load=flags.load,
+            save=flags.save,
+            size=flags.size,
+            infinite=flags.infinite,
+            fps=flags.fps,
+        )
+    finally:
+        if profiler:
+            profiling.remove_hook(profiler)
+            with open(flags.profile, "w") as fp:
+                profiler.dump(fp)
+            print(f"Wrote the profile to {flags.profile}.", file=sys.stderr)
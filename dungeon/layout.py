@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import random
+from typing import Iterator, Sequence
+
+from maze import Maze, Size as MazeSize
+from maze.algorithms import GenerationAlgorithm
+from maze.cell import CARDINAL_DIRECTIONS, OFFSETS, CardinalDirection
+
+from .rooms import Position, Room, Chamber, StartingChamber, pos
+
+__all__ = ("Dungeon",)
+
+
+def _fits(cls: type[Room], doors: int) -> bool:
+    return cls.MIN_DOORS <= doors <= cls.MAX_DOORS
+
+
+class Dungeon:
+    """Rooms laid out on the tiles of a maze.
+
+    Every tile of the maze holds one room, and every hallway of the maze is a
+    pair of doors between two rooms, so a room has as many doors as its tile
+    has hallways. The starting room is placed at the start of the maze.
+
+    Rooms of the same class share their grid, see :class:`Room`, so the
+    memory used grows with the amount of room classes and of changed rooms,
+    not with the amount of rooms.
+
+    size: maze.Size
+        The amount of rooms, as the size of the maze.
+    room_classes: Sequence[type[Room]]
+        The classes to pick the rooms from. A class is only picked for tiles
+        with an amount of hallways between its ``MIN_DOORS`` and ``MAX_DOORS``.
+    start_class: type[Room]
+        The class of the starting room, which must fit the hallways of the
+        start tile the same way.
+    seed: int | None
+        The seed of the maze and of the room picks.
+    algorithm: str | GenerationAlgorithm
+        The algorithm used to generate the maze. See :meth:`Maze.generate`.
+
+    Raises :class:`ValueError` when a tile has an amount of hallways that no
+    room class fits.
+    """
+
+    def __init__(
+        self,
+        size: MazeSize,
+        *,
+        room_classes: Sequence[type[Room]] = (Chamber,),
+        start_class: type[Room] = StartingChamber,
+        seed: int | None = None,
+        algorithm: str | GenerationAlgorithm = "dfs",
+    ):
+        if not room_classes:
+            raise ValueError("At least one room class is needed.")
+
+        self.maze = Maze(size, compact=True, seed=seed)
+        self.maze.generate(algorithm)
+        rng = random.Random(seed)
+
+        # The classes that fit every amount of doors.
+        fitting = {
+            doors: [cls for cls in room_classes if _fits(cls, doors)] for doors in range(len(CARDINAL_DIRECTIONS) + 1)
+        }
+
+        self.rooms: dict[Position, Room] = {}
+        start_x, start_y = self.maze.start.actual()
+        self.start = pos(start_x // 2, start_y // 2)
+        for position in self.positions():
+            doors = len(self.doors(position))
+            if position == self.start:
+                if not _fits(start_class, doors):
+                    raise ValueError(f"The starting room class {start_class.__name__} does not fit {doors} doors.")
+                cls = start_class
+            elif fitting[doors]:
+                cls = rng.choice(fitting[doors])
+            else:
+                raise ValueError(f"No room class fits {doors} doors, at ({position.x}, {position.y}).")
+            self.rooms[position] = cls(door_count=doors)
+
+    @property
+    def size(self) -> MazeSize:
+        return self.maze.size
+
+    def positions(self) -> Iterator[Position]:
+        width, height = self.maze.size
+        for y in range(height):
+            for x in range(width):
+                yield pos(x, y)
+
+    def doors(self, position: Position) -> list[CardinalDirection]:
+        """The directions of the doors of the room at ``position``."""
+        cell = self.maze.cell_at(position.x * 2, position.y * 2)
+        if cell is None:
+            raise KeyError(position)
+        return [direction for direction in CARDINAL_DIRECTIONS if cell.hallways[direction]]
+
+    def neighbours(self, position: Position) -> dict[CardinalDirection, Position]:
+        """The rooms behind every door of the room at ``position``."""
+        return {
+            direction: pos(position.x + OFFSETS[direction][0], position.y + OFFSETS[direction][1])
+            for direction in self.doors(position)
+        }
+
+    def __getitem__(self, position: Position) -> Room:
+        return self.rooms[position]
+
+    def __len__(self) -> int:
+        return len(self.rooms)
+
+    def __iter__(self) -> Iterator[Room]:
+        return iter(self.rooms.values())
+
+    def modified(self) -> list[Position]:
+        """The positions of the rooms that have their own grid."""
+        return [position for position, room in self.rooms.items() if room.modified]
@@ -1,11 +1,8 @@
 import random
+from collections import OrderedDict
 from math import floor, ceil
 from enum import Enum
-from typing import NamedTuple
-from rich.color import Color
-from rich import pretty
-
-pretty.install()
+from typing import NamedTuple, Sequence
 
 
 class Tile(Enum):
@@ -43,7 +40,66 @@ class Chest:
     ...
 
 
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+class RenderCache:
+    """A least recently used cache of rendered rooms, holding up to ``maxsize`` renders."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._renders: OrderedDict[tuple[Position | None, bool], tuple[str, ...]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple[Position | None, bool]) -> tuple[str, ...] | None:
+        try:
+            self._renders.move_to_end(key)
+        except KeyError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._renders[key]
+
+    def put(self, key: tuple[Position | None, bool], render: tuple[str, ...]):
+        self._renders[key] = render
+        self._renders.move_to_end(key)
+        while len(self._renders) > self.maxsize:
+            self._renders.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._renders.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(self.hits, self.misses, self.evictions, len(self._renders), self.maxsize)
+
+
+Grid = Sequence[Sequence[Tile]]
+
+# The grid built by ``construct`` for every room class, shared by all its rooms.
+_TEMPLATES: dict[type["Room"], tuple[tuple[Tile, ...], ...]] = {}
+
+
 class Room:
+    """A room of the dungeon.
+
+    Every room of a class shares one read-only template grid, built by
+    :meth:`construct` the first time a room of that class is created. A room
+    gets its own copy of the grid only when it is changed, through
+    :meth:`set_tile` or by assigning :attr:`grid`.
+
+    door_count: int | None
+        The amount of doors. Defaults to a random amount, see ``MIN_DOORS``.
+    """
+
     SIZE: Size = Size(20, 20)
 
     # Door settings.
@@ -59,20 +115,27 @@ class Room:
     CHEST_WEIGHTS_STEP: int = 0
     CHEST_CLASSES: list[type[Chest]] = []
 
-    def __init__(self):
-        self.render_cache: dict[tuple[Position | None, bool], list[str]] = {}
-        self.grid: list[list[Tile]] = []
-
-        self.door_count, *_ = random.choices(
-            range(self.MIN_DOORS, max(self.MAX_DOORS, self.MIN_DOORS) + 1),
-            weights=range(
-                self.DOOR_WEIGHTS_START,
-                self.DOOR_WEIGHTS_STEP * (self.MAX_DOORS - self.MIN_DOORS + 1) + self.DOOR_WEIGHTS_START,
-                self.DOOR_WEIGHTS_STEP,
+    # Render settings.
+    RENDER_CACHE_SIZE: int = 64
+    PLAYER: str = "@"
+    OPENED_CHEST: str = "c"
+
+    def __init__(self, door_count: int | None = None):
+        self._render_cache: RenderCache | None = None
+        self._grid: Grid = ()
+
+        if door_count is None:
+            door_count, *_ = random.choices(
+                range(self.MIN_DOORS, max(self.MAX_DOORS, self.MIN_DOORS) + 1),
+                weights=range(
+                    self.DOOR_WEIGHTS_START,
+                    self.DOOR_WEIGHTS_STEP * (self.MAX_DOORS - self.MIN_DOORS + 1) + self.DOOR_WEIGHTS_START,
+                    self.DOOR_WEIGHTS_STEP,
+                )
+                if self.DOOR_WEIGHTS_STEP
+                else None,
             )
-            if self.DOOR_WEIGHTS_STEP
-            else None,
-        )
+        self.door_count = door_count
 
         if self.MAX_CHESTS and not self.CHEST_CLASSES:
             raise RuntimeError(f"Class {type(self).__name__!r} has MAX_CHESTS={self.MAX_CHESTS} with no chest classes.")
@@ -88,23 +151,100 @@ class Room:
             else None,
         )
 
-        self.construct()
+        try:
+            self._template = _TEMPLATES[type(self)]
+        except KeyError:
+            self.construct()
+            self._template = _TEMPLATES[type(self)] = tuple(tuple(row) for row in self._grid)
+        self._grid = self._template
+
         self.opened_chests: dict[Position, Chest] = {}
         self.put_chests()
 
+    @property
+    def render_cache(self) -> RenderCache:
+        if self._render_cache is None:
+            self._render_cache = RenderCache(self.RENDER_CACHE_SIZE)
+        return self._render_cache
+
+    @property
+    def grid(self) -> Grid:
+        """The tiles of the room. Read-only unless it was assigned, use :meth:`set_tile` to change a tile."""
+        return self._grid
+
+    @grid.setter
+    def grid(self, grid: Grid):
+        self._grid = grid
+        self.invalidate()
+
+    @property
+    def modified(self) -> bool:
+        """Whether the room has its own grid instead of the template of its class."""
+        return self._grid is not self._template
+
+    def set_tile(self, position: Position, tile: Tile):
+        """Changes a tile, copying the template grid first."""
+        if not self.modified:
+            self._grid = [list(row) for row in self._template]
+        self._grid[position.y][position.x] = tile  # type: ignore
+        self.invalidate()
+
+    def invalidate(self):
+        """Drops every cached render. Call after changing the grid in place."""
+        if self._render_cache is not None:
+            self._render_cache.clear()
+
     def construct(self):
+        """Builds the grid of the room class into :attr:`grid`.
+
+        Called once per class, so it must build the same grid every time."""
         ...
 
     def put_chests(self):
         ...
 
+    def open_chest(self, position: Position) -> Chest:
+        """Opens the chest at ``position``, and returns what was in it."""
+        if self.grid[position.y][position.x] is not Tile.chest or position in self.opened_chests:
+            raise ValueError(f"There is no closed chest at {position}.")
+
+        chest = self.opened_chests[position] = random.choice(self.CHEST_CLASSES)()
+        self.invalidate()
+        return chest
+
     def pprint(self):
         for row in self.grid:
             print("".join(x.value for x in row))
 
-    def render(self, player: Position | None = None, zoomed: bool = False) -> list[str]:
-        if c := self.render_cache.get((player, zoomed), None):
-            return c
+    def render(self, player: Position | None = None, zoomed: bool = False) -> tuple[str, ...]:
+        """Renders the room as lines of text, with the player at ``player``.
+
+        When ``zoomed``, every tile takes two lines of two characters. Renders
+        are cached until the grid changes or a chest is opened, and shared
+        between calls."""
+        key = (player, zoomed)
+        if (lines := self.render_cache.get(key)) is not None:
+            return lines
+
+        rows: list[str] = []
+        for y, row in enumerate(self.grid):
+            chars = [x.value for x in row]
+            for position in self.opened_chests:
+                if position.y == y:
+                    chars[position.x] = self.OPENED_CHEST
+            if player and player.y == y:
+                chars[player.x] = self.PLAYER
+
+            if zoomed:
+                line = "".join(char * 2 for char in chars)
+                rows += [line, line]
+            else:
+                rows.append("".join(chars))
+
+        # A tuple, so the cached render cannot be changed by callers.
+        lines = tuple(rows)
+        self.render_cache.put(key, lines)
+        return lines
 
 
 class StarterChest(Chest):
@@ -149,7 +289,28 @@ class Room22(StartingRoom):
     SIZE = Size(21, 21)
 
 
-room = StartingRoom()
-room.pprint()
-room2 = Room22()
-room2.pprint()
+class Chamber(Room22):
+    """A room without chests, that fits any amount of doors. See :class:`dungeon.layout.Dungeon`."""
+
+    MIN_DOORS = 1
+    MIN_CHESTS = 0
+    MAX_CHESTS = 0
+    CHEST_CLASSES = []
+    CHEST_WEIGHTS_STEP = 0
+
+
+class StartingChamber(Room22):
+    """A starting room that fits any amount of doors. See :class:`dungeon.layout.Dungeon`."""
+
+    MIN_DOORS = 1
+
+
+if __name__ == "__main__":
+    from rich import pretty
+
+    pretty.install()
+
+    room = StartingRoom()
+    room.pprint()
+    room2 = Room22()
+    room2.pprint()
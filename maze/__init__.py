@@ -1,3 +1,90 @@
-from .player import *
-from .maze import *
-from .theme import *
+"""A maze game and the tools around it.
+
+The names below are imported from their modules the first time they are
+used, so ``import maze`` does not load anything else. Submodules that are
+not listed here, such as :mod:`maze.simulation` or :mod:`maze.analysis`,
+are imported by their own name.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+
+# Same as ``typing.TYPE_CHECKING``, without importing ``typing``, which is slow to import.
+# Deleted once used, so it is not an attribute of the package.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+
+    from .player import *
+    from .maze import *
+    from .algorithms import *
+    from .world import *
+    from .theme import *
+    from .renderer import *
+    from .viewport import *
+    from .trail import *
+    from .solver import *
+
+# The module that defines every exported name, in the order of ``__all__``.
+_EXPORTS = {
+    "Player": "player",
+    "Size": "maze",
+    "Maze": "maze",
+    "GenerationAlgorithm": "algorithms",
+    "ALGORITHMS": "algorithms",
+    "eller_rows": "algorithms",
+    "World": "world",
+    "Theme": "theme",
+    "DEFAULT_THEME": "theme",
+    "FrameRenderer": "renderer",
+    "Viewport": "viewport",
+    "Camera": "viewport",
+    "Trail": "trail",
+    "neighbours": "solver",
+    "bfs": "solver",
+    "astar": "solver",
+    "dead_end_fill": "solver",
+    "DistanceField": "solver",
+    "distance_field": "solver",
+}
+
+__all__ = (
+    "Player",
+    "Size",
+    "Maze",
+    "GenerationAlgorithm",
+    "ALGORITHMS",
+    "eller_rows",
+    "World",
+    "Theme",
+    "DEFAULT_THEME",
+    "FrameRenderer",
+    "Viewport",
+    "Camera",
+    "Trail",
+    "neighbours",
+    "bfs",
+    "astar",
+    "dead_end_fill",
+    "DistanceField",
+    "distance_field",
+)
+
+del TYPE_CHECKING
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(import_module(f".{module}", __name__), name)
+    # Later lookups do not go through here.
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+from collections import deque
+import random
+from typing import Callable, Iterator, TypeAlias, TYPE_CHECKING
+
+from .cell import CardinalDirection, HALLWAY_FLAGS, OFFSETS
+
+if TYPE_CHECKING:
+    from .maze import Maze
+
+__all__ = ("GenerationAlgorithm", "ALGORITHMS", "eller_rows")
+
+GenerationAlgorithm: TypeAlias = "Callable[[Maze], None]"
+
+_DIRECTIONS: list[CardinalDirection] = ["N", "S", "W", "E"]
+
+
+class DisjointSet:
+    """Union-find over the integers ``0..size-1``."""
+
+    __slots__ = ("parents", "sizes")
+
+    def __init__(self, size: int):
+        self.parents = list(range(size))
+        self.sizes = [1] * size
+
+    def find(self, item: int) -> int:
+        parents = self.parents
+        while parents[item] != item:
+            # Path halving.
+            parents[item] = item = parents[parents[item]]
+        return item
+
+    def union(self, a: int, b: int) -> bool:
+        """Joins the sets of ``a`` and ``b``. Returns whether they were disjoint."""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self.sizes[a] < self.sizes[b]:
+            a, b = b, a
+        self.parents[b] = a
+        self.sizes[a] += self.sizes[b]
+        return True
+
+
+def _unvisited_neighbours(maze: Maze, visited: bytearray, x: int, y: int):
+    width, height = maze.size
+    neighbours: list[tuple[CardinalDirection, int, int]] = []
+    for direction in _DIRECTIONS:
+        dx, dy = OFFSETS[direction]
+        nx, ny = x + dx, y + dy
+        if 0 <= nx < width and 0 <= ny < height and not visited[ny * width + nx]:
+            neighbours.append((direction, nx, ny))
+    return neighbours
+
+
+def depth_first(maze: Maze):
+    """Randomized depth-first search.
+
+    https://en.wikipedia.org/wiki/Maze_generation_algorithm
+
+    How it works:
+    First, you have a stack of cells. Initially
+    it only contains the starting point.
+
+    - Visit the last cell of the stack.
+    - Find a random neighbour that has not been visited.
+      - if found, push neighbour to stack and draw
+        a path to it, thus marking it as visited.
+      - else, backtrack (pop from stack) and goto point 1.
+
+    The algorithm finishes when the stack is exhausted."""
+    width, height = maze.size
+    visited = bytearray(width * height)
+
+    # Tiles are identified by their index. Neighbours are encoded as
+    # ``index * 4 + direction`` so that finding them allocates no tuples.
+    neighbours: list[int] = []
+
+    start = maze.start.y * width + maze.start.x
+    stack: deque[int] = deque([start])
+    visited[start] = 1
+
+    while stack:
+        index = stack[-1]
+        y, x = divmod(index, width)
+
+        neighbours.clear()
+        if y > 0 and not visited[index - width]:
+            neighbours.append((index - width) * 4)
+        if y < height - 1 and not visited[index + width]:
+            neighbours.append((index + width) * 4 + 1)
+        if x > 0 and not visited[index - 1]:
+            neighbours.append((index - 1) * 4 + 2)
+        if x < width - 1 and not visited[index + 1]:
+            neighbours.append((index + 1) * 4 + 3)
+
+        if not neighbours:
+            stack.pop()
+            continue
+
+        next, direction = divmod(maze.rng.choice(neighbours), 4)
+        maze.carve(x, y, _DIRECTIONS[direction])
+        visited[next] = 1
+        stack.append(next)
+
+
+def kruskal(maze: Maze):
+    """Randomized Kruskal's algorithm.
+
+    Every wall between two tiles is visited in random order, and is
+    removed when the tiles it divides are not yet connected."""
+    width, height = maze.size
+    edges: list[tuple[int, int, CardinalDirection]] = [(x, y, "E") for y in range(height) for x in range(width - 1)]
+    edges.extend((x, y, "S") for y in range(height - 1) for x in range(width))
+    maze.rng.shuffle(edges)
+
+    sets = DisjointSet(width * height)
+    for x, y, direction in edges:
+        index = y * width + x
+        if sets.union(index, index + 1 if direction == "E" else index + width):
+            maze.carve(x, y, direction)
+
+
+def prim(maze: Maze):
+    """Randomized Prim's algorithm.
+
+    Starting from the starting point, a random wall on the frontier of
+    the carved area is opened as long as it leads to an unvisited tile."""
+    width = maze.size.width
+    visited = bytearray(width * maze.size.height)
+    frontier: list[tuple[int, int, CardinalDirection]] = []
+
+    def visit(x: int, y: int):
+        visited[y * width + x] = 1
+        frontier.extend((x, y, direction) for direction, _, _ in _unvisited_neighbours(maze, visited, x, y))
+
+    visit(maze.start.x, maze.start.y)
+
+    while frontier:
+        # Swap-remove a random wall.
+        index = maze.rng.randrange(len(frontier))
+        frontier[index], frontier[-1] = frontier[-1], frontier[index]
+        x, y, direction = frontier.pop()
+
+        dx, dy = OFFSETS[direction]
+        nx, ny = x + dx, y + dy
+        if visited[ny * width + nx]:
+            continue
+
+        maze.carve(x, y, direction)
+        visit(nx, ny)
+
+
+def wilson(maze: Maze):
+    """Wilson's algorithm.
+
+    From every tile not yet in the maze, a loop-erased random walk is
+    taken until it reaches the maze, and the walked path is carved.
+    Produces an unbiased sample of all possible mazes."""
+    width, height = maze.size
+    visited = bytearray(width * height)
+    # The direction last taken out of every tile during the current walk.
+    exits = bytearray(width * height)
+
+    visited[maze.start.y * width + maze.start.x] = 1
+
+    for index in range(width * height):
+        if visited[index]:
+            continue
+
+        # Random walk until the maze is found. Overwriting the exit of a
+        # tile that was visited before erases the loop that was formed.
+        x, y = index % width, index // width
+        while not visited[y * width + x]:
+            options = [
+                number
+                for number, direction in enumerate(_DIRECTIONS)
+                if 0 <= x + OFFSETS[direction][0] < width and 0 <= y + OFFSETS[direction][1] < height
+            ]
+            exits[y * width + x] = number = maze.rng.choice(options)
+            dx, dy = OFFSETS[_DIRECTIONS[number]]
+            x, y = x + dx, y + dy
+
+        # Carve the loop-erased walk.
+        x, y = index % width, index // width
+        while not visited[y * width + x]:
+            visited[y * width + x] = 1
+            direction = _DIRECTIONS[exits[y * width + x]]
+            maze.carve(x, y, direction)
+            dx, dy = OFFSETS[direction]
+            x, y = x + dx, y + dy
+
+
+def sidewinder(maze: Maze):
+    """Sidewinder algorithm.
+
+    The first row is a single corridor. Every other row is split into
+    runs of tiles joined eastwards, and each run is joined north once."""
+    width, height = maze.size
+
+    for x in range(width - 1):
+        maze.carve(x, 0, "E")
+
+    for y in range(1, height):
+        run_start = 0
+        for x in range(width):
+            if x < width - 1 and maze.rng.getrandbits(1):
+                maze.carve(x, y, "E")
+            else:
+                maze.carve(maze.rng.randint(run_start, x), y, "N")
+                run_start = x + 1
+
+
+def eller_rows(width: int, height: int, rng: random.Random | None = None) -> Iterator[list[int]]:
+    """Generates a maze with Eller's algorithm, one row at a time.
+
+    Yields the :data:`HALLWAY_FLAGS` of every tile of each finished row.
+    Only the state of the current row is kept, so memory use is ``O(width)``
+    no matter how many rows are generated."""
+    rng = rng or random.Random()
+    north, south, east, west = (HALLWAY_FLAGS[direction] for direction in ("N", "S", "E", "W"))
+
+    sets = list(range(width))
+    members: dict[int, list[int]] = {index: [index] for index in range(width)}
+    next_set = width
+    row = [0] * width
+
+    for y in range(height):
+        last = y == height - 1
+
+        # Join adjacent tiles that belong to different sets.
+        for x in range(width - 1):
+            a, b = sets[x], sets[x + 1]
+            if a != b and (last or rng.getrandbits(1)):
+                row[x] |= east
+                row[x + 1] |= west
+
+                if len(members[a]) < len(members[b]):
+                    a, b = b, a
+                for member in members[b]:
+                    sets[member] = a
+                members[a] += members.pop(b)
+
+        if last:
+            yield row
+            return
+
+        # Every set continues downwards through at least one of its tiles.
+        below = [0] * width
+        below_sets = [-1] * width
+        for set_id, tiles in members.items():
+            down = [x for x in tiles if rng.getrandbits(1)] or [rng.choice(tiles)]
+            for x in down:
+                row[x] |= south
+                below[x] = north
+                below_sets[x] = set_id
+
+        yield row
+
+        members = {}
+        for x in range(width):
+            if below_sets[x] == -1:
+                below_sets[x] = next_set
+                next_set += 1
+            members.setdefault(below_sets[x], []).append(x)
+
+        sets = below_sets
+        row = below
+
+
+def eller(maze: Maze):
+    """Eller's algorithm. See :func:`eller_rows`."""
+    east, south = HALLWAY_FLAGS["E"], HALLWAY_FLAGS["S"]
+
+    for y, row in enumerate(eller_rows(*maze.size, rng=maze.rng)):
+        for x, flags in enumerate(row):
+            if flags & east:
+                maze.carve(x, y, "E")
+            if flags & south:
+                maze.carve(x, y, "S")
+
+
+def numpy_binary_tree(maze: Maze):
+    """Binary tree algorithm, vectorized with NumPy. See :mod:`maze.vectorized`."""
+    from .vectorized import binary_tree
+
+    binary_tree(maze)
+
+
+def numpy_sidewinder(maze: Maze):
+    """Sidewinder algorithm, vectorized with NumPy. See :mod:`maze.vectorized`."""
+    from .vectorized import sidewinder
+
+    sidewinder(maze)
+
+
+ALGORITHMS: dict[str, GenerationAlgorithm] = {
+    "dfs": depth_first,
+    "kruskal": kruskal,
+    "prim": prim,
+    "wilson": wilson,
+    "sidewinder": sidewinder,
+    "eller": eller,
+    "numpy_binary_tree": numpy_binary_tree,
+    "numpy_sidewinder": numpy_sidewinder,
+}
@@ -0,0 +1,252 @@
+"""Analysis and validation of generated mazes.
+
+:func:`analyze` checks that the hallways of a maze are consistent and
+measures it in one pass over its :data:`HALLWAY_FLAGS`: whether it is
+connected and perfect (without loops), its dead ends and junctions, its
+diameter and the length of its solution. The result is a :class:`MazeReport`.
+
+Counting and validation work on whole rows of flags with bytes operations,
+so array-backed grids are never turned into cells. Loops are found with
+union-find and the diameter with two breadth-first sweeps. Distances are
+measured in steps on the actual grid, like in :mod:`maze.solver`.
+
+Files written by :mod:`maze.batch` are analyzed with ``python -m maze.analysis``.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import deque
+from itertools import compress, islice
+import json
+from multiprocessing import Pool
+import sys
+from typing import Any, BinaryIO, Iterable, Iterator, NamedTuple, Sequence
+
+from .algorithms import DisjointSet
+from .cell import Point, HALLWAY_FLAGS
+from .maze import Maze, Size
+from .storage import MazeRecord, read_records, unpack_flags
+
+__all__ = ("MazeReport", "analyze", "analyze_flags", "analyze_record", "analyze_records", "validate_flags")
+
+_NORTH, _SOUTH, _EAST, _WEST = (HALLWAY_FLAGS[direction] for direction in ("N", "S", "E", "W"))
+
+# For ``bytes.translate``: the amount of hallways of a tile, and whether it has each of them.
+_DEGREES = bytes(bin(flags & 0xF).count("1") for flags in range(256))
+_HAS = {flag: bytes(bool(flags & flag) for flags in range(256)) for flag in (_NORTH, _SOUTH, _EAST, _WEST)}
+
+# The maximum amount of errors reported per maze.
+MAX_ERRORS = 16
+
+
+class MazeReport(NamedTuple):
+    """The measurements of a maze. See :func:`analyze`.
+
+    ``loops`` is the amount of hallways that close a loop, ``dead_ends`` the
+    tiles with a single hallway and ``junctions`` the ones with three or more.
+    ``diameter`` is the longest shortest path of the part of the maze holding
+    the start, exact when that part has no loops. ``solution_length`` is
+    ``None`` when the end cannot be reached from the start. ``errors``
+    describes hallways that lead out of the maze or only exist on one side."""
+
+    size: Size
+    seed: int | None
+    tiles: int
+    hallways: int
+    components: int
+    loops: int
+    dead_ends: int
+    junctions: int
+    diameter: int
+    solution_length: int | None
+    errors: tuple[str, ...]
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+    @property
+    def connected(self) -> bool:
+        return self.components == 1
+
+    @property
+    def perfect(self) -> bool:
+        """Whether there is exactly one path between every two tiles."""
+        return self.valid and self.connected and self.loops == 0
+
+    def to_dict(self) -> dict[str, Any]:
+        report = self._asdict()
+        report.update(valid=self.valid, connected=self.connected, perfect=self.perfect)
+        return report
+
+
+def _mismatches(flags: bytes, width: int, height: int) -> Iterator[str]:
+    has = {flag: flags.translate(table) for flag, table in _HAS.items()}
+    east, west, south, north = has[_EAST], has[_WEST], has[_SOUTH], has[_NORTH]
+    no_tiles = bytes(width)
+
+    for y in range(height):
+        row = slice(y * width, (y + 1) * width)
+        # Every row is compared as a whole, tiles are only looked at when it does not match.
+        if east[row][:-1] != west[row][1:] or east[row][-1] or west[row][0]:
+            for x in range(width):
+                if east[y * width + x] and (x == width - 1 or not west[y * width + x + 1]):
+                    yield f"Hallway E from ({x}, {y}) has no way back."
+                if west[y * width + x] and (x == 0 or not east[y * width + x - 1]):
+                    yield f"Hallway W from ({x}, {y}) has no way back."
+
+        below = slice((y + 1) * width, (y + 2) * width) if y < height - 1 else None
+        if (south[row] != (no_tiles if below is None else north[below])) or (y == 0 and north[row] != no_tiles):
+            for x in range(width):
+                if south[y * width + x] and (below is None or not north[(y + 1) * width + x]):
+                    yield f"Hallway S from ({x}, {y}) has no way back."
+                if north[y * width + x] and (y == 0 or not south[(y - 1) * width + x]):
+                    yield f"Hallway N from ({x}, {y}) has no way back."
+
+
+def validate_flags(size: Size, flags: bytes | bytearray) -> list[str]:
+    """The problems with the hallways of a maze, given as :meth:`Maze.hallway_flags`.
+
+    Every hallway must lead to a tile of the maze with a hallway back. At
+    most :data:`MAX_ERRORS` are returned."""
+    width, height = size
+    if len(flags) != width * height:
+        return [f"Expected {width * height} hallway flags, got {len(flags)}."]
+    return list(islice(_mismatches(bytes(flags), width, height), MAX_ERRORS))
+
+
+def _sweep(flags: bytes, width: int, source: int) -> tuple[int, list[int]]:
+    """Breadth-first search over the tiles. Returns the farthest tile from
+    ``source`` and the distance in hallways to every tile, ``-1`` if unreachable."""
+    distances = [-1] * len(flags)
+    distances[source] = 0
+    queue = deque([source])
+    index = source
+
+    while queue:
+        index = queue.popleft()
+        tile, distance = flags[index], distances[index] + 1
+        for flag, next in ((_NORTH, index - width), (_SOUTH, index + width), (_EAST, index + 1), (_WEST, index - 1)):
+            if tile & flag and distances[next] == -1:
+                distances[next] = distance
+                queue.append(next)
+
+    # The last tile dequeued is the farthest one.
+    return index, distances
+
+
+def _index(point: Point, width: int) -> int:
+    x, y = point.actual()
+    return y // 2 * width + x // 2
+
+
+def analyze_flags(
+    size: Size,
+    flags: bytes | bytearray,
+    *,
+    start: Point | None = None,
+    end: Point | None = None,
+    seed: int | None = None,
+) -> MazeReport:
+    """Measures a maze given as :meth:`Maze.hallway_flags`. See :func:`analyze`.
+
+    Without ``start``, the diameter is measured from the first tile, and
+    without ``end`` the solution length is ``None``."""
+    width, height = size
+    flags = bytes(flags)
+    tiles = width * height
+    errors = tuple(validate_flags(size, flags))
+
+    degrees = flags.translate(_DEGREES)
+    dead_ends = degrees.count(1)
+    junctions = degrees.count(3) + degrees.count(4)
+
+    if errors:
+        # Hallways cannot be followed safely.
+        hallways = sum(degrees) // 2
+        return MazeReport(size, seed, tiles, hallways, 0, 0, dead_ends, junctions, 0, None, errors)
+
+    # Every hallway is seen once, from its west or north side.
+    sets = DisjointSet(tiles)
+    hallways = loops = 0
+    for index in compress(range(tiles), flags.translate(_HAS[_EAST])):
+        hallways += 1
+        loops += not sets.union(index, index + 1)
+    for index in compress(range(tiles), flags.translate(_HAS[_SOUTH])):
+        hallways += 1
+        loops += not sets.union(index, index + width)
+    components = tiles - (hallways - loops)
+
+    source = _index(start, width) if start is not None else 0
+    farthest, distances = _sweep(flags, width, source)
+    solution = distances[_index(end, width)] if end is not None else -1
+    _, distances = _sweep(flags, width, farthest)
+    diameter = max(distances)
+
+    return MazeReport(
+        size,
+        seed,
+        tiles,
+        hallways,
+        components,
+        loops,
+        dead_ends,
+        junctions,
+        diameter * 2,
+        solution * 2 if solution != -1 else None,
+        errors,
+    )
+
+
+def analyze(maze: Maze) -> MazeReport:
+    """Validates a generated maze and measures it."""
+    if not maze.generated:
+        raise RuntimeError("Passed a non-generated map.")
+    return analyze_flags(maze.size, maze.hallway_flags(), start=maze.start, end=maze.end, seed=maze.seed)
+
+
+def analyze_record(record: MazeRecord) -> MazeReport:
+    """Validates and measures a maze read with :func:`maze.storage.read_records`, without building it."""
+    flags = unpack_flags(record.packed, record.size.width * record.size.height)
+    return analyze_flags(record.size, flags, start=record.start, end=record.end, seed=record.seed)
+
+
+def analyze_records(
+    records: Iterable[MazeRecord], *, processes: int | None = None, chunksize: int = 64
+) -> Iterator[MazeReport]:
+    """Analyzes the records in a process pool, one per core by default, and yields the reports in order.
+
+    With ``processes=1`` the records are analyzed in this process."""
+    if processes == 1:
+        yield from map(analyze_record, records)
+        return
+
+    with Pool(processes) as pool:
+        yield from pool.imap(analyze_record, records, chunksize=chunksize)
+
+
+def _write_reports(fp: BinaryIO, out: Any, processes: int | None) -> tuple[int, int]:
+    analyzed = perfect = 0
+    for report in analyze_records(read_records(fp), processes=processes):
+        out.write(json.dumps(report.to_dict()) + "\n")
+        analyzed += 1
+        perfect += report.perfect
+    return analyzed, perfect
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="maze.analysis", description="Validates and measures the mazes of a file.")
+    parser.add_argument("input", help="A file written by maze.batch.")
+    parser.add_argument("-p", "--processes", type=int, default=None, help="Worker processes. Defaults to one per core.")
+    flags = parser.parse_args(argv)
+
+    with open(flags.input, "rb") as fp:
+        analyzed, perfect = _write_reports(fp, sys.stdout, flags.processes)
+
+    print(f"Analyzed {analyzed} mazes, {perfect} perfect.", file=sys.stderr)
+    return 0 if analyzed == perfect else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Generates many mazes in parallel into a :mod:`maze.storage` file.
+
+Run with ``python -m maze.batch``. See ``--help`` for the options.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+from multiprocessing.pool import AsyncResult
+import os
+import sys
+from typing import BinaryIO, Iterator, Sequence
+
+from .algorithms import ALGORITHMS
+from .maze import Maze, Size
+from .storage import MazeRecord, write_header
+
+__all__ = ("generate_batch",)
+
+# The chunks of jobs queued per worker process, so workers never wait for the next one.
+CHUNKS_PER_PROCESS = 2
+
+
+def _generate(job: tuple[Size, int, str]) -> bytes:
+    size, seed, algorithm = job
+    # Compact mazes skip filling the paths, which are not stored.
+    maze = Maze(size, compact=True, seed=seed)
+    maze.generate(algorithm)
+    return MazeRecord.from_maze(maze).to_bytes()
+
+
+def _generate_chunk(jobs: list[tuple[Size, int, str]]) -> list[bytes]:
+    return [_generate(job) for job in jobs]
+
+
+def _write(fp: BinaryIO, records: list[bytes]) -> int:
+    fp.writelines(records)
+    return len(records)
+
+
+def _jobs(count: int, sizes: Sequence[Size], seed: int, algorithm: str) -> Iterator[tuple[Size, int, str]]:
+    for size_index, size in enumerate(sizes):
+        for index in range(count):
+            yield size, seed + size_index * count + index, algorithm
+
+
+def generate_batch(
+    fp: BinaryIO,
+    count: int,
+    sizes: Sequence[Size],
+    *,
+    seed: int = 0,
+    algorithm: str = "dfs",
+    processes: int | None = None,
+    chunksize: int = 16,
+) -> int:
+    """Generates ``count`` mazes of every size and writes them to ``fp``.
+
+    Maze ``n`` of the batch is generated with the seed ``seed + n``, so a
+    batch can be generated again. Records are written in order. Jobs are
+    handed to the process pool (``processes`` defaults to one per core) in
+    chunks of ``chunksize``, and at most :data:`CHUNKS_PER_PROCESS` chunks per
+    process are queued or waiting to be written, so memory does not grow with
+    the size of the batch.
+
+    Returns the amount of mazes written."""
+    processes = processes or os.cpu_count() or 1
+    jobs = _jobs(count, sizes, seed, algorithm)
+    write_header(fp)
+    written = 0
+
+    with Pool(processes) as pool:
+        pending: deque[AsyncResult[list[bytes]]] = deque()
+        for chunk in iter(lambda: list(islice(jobs, chunksize)), []):
+            pending.append(pool.apply_async(_generate_chunk, (chunk,)))
+            if len(pending) == processes * CHUNKS_PER_PROCESS:
+                written += _write(fp, pending.popleft().get())
+
+        for result in pending:
+            written += _write(fp, result.get())
+
+    return written
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="maze.batch", description="Generates mazes in parallel.")
+    parser.add_argument("output", help="The file to write the mazes to.")
+    parser.add_argument("-n", "--count", type=int, default=1, help="Mazes per size.")
+    parser.add_argument("-s", "--sizes", type=Size.parse, nargs="+", default=[Size(50, 50)], help="Sizes, as WIDTHxHEIGHT.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first maze.")
+    parser.add_argument("-a", "--algorithm", choices=list(ALGORITHMS), default="dfs", help="Generation algorithm.")
+    parser.add_argument("-p", "--processes", type=int, default=None, help="Worker processes. Defaults to one per core.")
+    flags = parser.parse_args(argv)
+
+    with open(flags.output, "wb") as fp:
+        written = generate_batch(
+            fp, flags.count, flags.sizes, seed=flags.seed, algorithm=flags.algorithm, processes=flags.processes
+        )
+
+    print(f"Wrote {written} mazes to {flags.output}.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
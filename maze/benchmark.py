@@ -0,0 +1,275 @@
+"""Benchmarks for maze generation, path filling, rendering and movement,
+and for the time it takes to import the packages.
+
+Run with ``python -m maze.benchmark``. See ``--help`` for the options.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, NamedTuple
+
+from .cell import CARDINAL_DIRECTIONS
+from .maze import Maze, Size
+from .player import Player
+from .simulation import Simulation
+
+__all__ = ("BenchmarkResult", "run_benchmarks", "run_import_benchmarks", "over_budget", "compare")
+
+DEFAULT_SIZES = (10, 100, 500, 1000, 2000)
+# The size from which mazes are compact unless told otherwise. Mazes of cell
+# objects that large take gigabytes of memory.
+COMPACT_SIZE = 1000
+
+# The most seconds that importing every module may take in a new interpreter.
+IMPORT_BUDGETS: dict[str, float] = {
+    "maze": 0.005,
+    "maze.maze": 0.040,
+    "maze.player": 0.050,
+    "dungeon.rooms": 0.025,
+}
+
+# Imports a module in a new interpreter, and prints how long it took, the
+# peak traced memory (when tracing) and the memory blocks still allocated.
+_IMPORT_SCRIPT = """
+import importlib, sys, time, tracemalloc
+if sys.argv[2] == "trace":
+    tracemalloc.start()
+blocks = sys.getallocatedblocks()
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+seconds = time.perf_counter() - start
+print(seconds, tracemalloc.get_traced_memory()[1], sys.getallocatedblocks() - blocks)
+"""
+
+
+class BenchmarkResult(NamedTuple):
+    name: str
+    size: int
+    seconds: float
+    peak_bytes: int
+    allocated_blocks: int
+    compact: bool = False
+
+    def key(self) -> str:
+        if not self.size:
+            return self.name
+        return f"{self.name}[{self.size}x{self.size}{' compact' if self.compact else ''}]"
+
+
+def _measure(name: str, size: int, func: Callable[[], Any], repeat: int, compact: bool = False) -> BenchmarkResult:
+    """Times ``func`` (best of ``repeat`` runs), then runs it once more under tracemalloc.
+
+    The allocated blocks are the ones still alive after the first run."""
+    seconds = float("inf")
+    blocks = 0
+    for run in range(repeat):
+        before = sys.getallocatedblocks()
+        start = time.perf_counter()
+        func()
+        seconds = min(seconds, time.perf_counter() - start)
+        if not run:
+            blocks = sys.getallocatedblocks() - before
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(name, size, seconds, peak, blocks, compact)
+
+
+def run_benchmarks(
+    sizes: tuple[int, ...] = DEFAULT_SIZES,
+    *,
+    seed: int = 0,
+    repeat: int = 3,
+    moves: int = 1000,
+    compact: bool | None = None,
+) -> list[BenchmarkResult]:
+    """Benchmarks :meth:`Maze.generate`, :meth:`Maze.fill_paths`, :meth:`Player.render`,
+    :meth:`Player.full_render`, ``moves`` calls to :meth:`Player.move` and a
+    :class:`Simulation` of ``moves`` steps for every size.
+
+    Mazes are compact from :data:`COMPACT_SIZE` unless ``compact`` is given.
+    Compact mazes fill their paths lazily, so they have no ``fill_paths`` result."""
+    results: list[BenchmarkResult] = []
+
+    for size in sizes:
+        is_compact = compact if compact is not None else size >= COMPACT_SIZE
+        maze = Maze(Size(size, size), compact=is_compact, seed=seed)
+
+        def generate():
+            maze.rng.seed(seed)
+            maze.generate()
+
+        results.append(_measure("generate", size, generate, repeat, is_compact))
+        if not is_compact:
+            results.append(_measure("fill_paths", size, maze.fill_paths, repeat))
+
+        player = Player(maze)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results.append(_measure("render", size, player.render, repeat, is_compact))
+            results.append(_measure("full_render", size, player.full_render, repeat, is_compact))
+
+        directions = random.Random(seed).choices(CARDINAL_DIRECTIONS, k=moves)
+
+        def move():
+            for direction in directions:
+                player.move(direction)
+
+        results.append(_measure("move", size, move, repeat, is_compact))
+
+        simulation = Simulation(maze)
+        results.append(_measure("simulate", size, lambda: simulation.run(directions, snap=False), repeat, is_compact))
+
+    return results
+
+
+def _import_once(module: str, trace: bool) -> tuple[float, int, int]:
+    # The root of the project, so its packages can be imported.
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, "-c", _IMPORT_SCRIPT, module, "trace" if trace else "time"],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    seconds, peak, blocks = output.split()
+    return float(seconds), int(peak), int(blocks)
+
+
+def run_import_benchmarks(modules: tuple[str, ...] = tuple(IMPORT_BUDGETS), *, repeat: int = 3) -> list[BenchmarkResult]:
+    """Times importing every module in a new interpreter (best of ``repeat`` runs), then imports it once more
+    under tracemalloc. Modules imported before, like :mod:`typing` for most of them, are counted too."""
+    results: list[BenchmarkResult] = []
+    for module in modules:
+        seconds, _, blocks = min(_import_once(module, trace=False) for _ in range(repeat))
+        _, peak, _ = _import_once(module, trace=True)
+        results.append(BenchmarkResult(f"import {module}", 0, seconds, peak, blocks))
+    return results
+
+
+def over_budget(
+    results: list[BenchmarkResult], budgets: dict[str, float] = IMPORT_BUDGETS
+) -> list[tuple[BenchmarkResult, float]]:
+    """Returns the import results that took longer than their budget, with the budget."""
+    over: list[tuple[BenchmarkResult, float]] = []
+    for result in results:
+        _, _, module = result.name.partition("import ")
+        budget = budgets.get(module)
+        if budget is not None and result.seconds > budget:
+            over.append((result, budget))
+    return over
+
+
+def compare(
+    results: list[BenchmarkResult], baseline: list[BenchmarkResult], threshold: float = 0.2
+) -> list[tuple[BenchmarkResult, BenchmarkResult]]:
+    """Returns the ``(result, baseline)`` pairs where the result is more than
+    ``threshold`` (a fraction) slower or uses more peak memory than the baseline."""
+    previous = {result.key(): result for result in baseline}
+    regressions: list[tuple[BenchmarkResult, BenchmarkResult]] = []
+
+    for result in results:
+        if old := previous.get(result.key()):
+            if result.seconds > old.seconds * (1 + threshold) or result.peak_bytes > old.peak_bytes * (1 + threshold):
+                regressions.append((result, old))
+
+    return regressions
+
+
+def dump(results: list[BenchmarkResult], fp: Any, **metadata: Any):
+    json.dump(
+        {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            **metadata,
+            "results": [result._asdict() for result in results],
+        },
+        fp,
+        indent=2,
+    )
+
+
+def load(fp: Any) -> list[BenchmarkResult]:
+    return [BenchmarkResult(**result) for result in json.load(fp)["results"]]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="maze.benchmark", description="Benchmarks the maze game.")
+    parser.add_argument("-s", "--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Maze sizes (width and height).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed used for every maze.")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Timed runs per benchmark. The best one is kept.")
+    parser.add_argument("-m", "--moves", type=int, default=1000, help="Moves per movement benchmark.")
+    parser.add_argument(
+        "-c",
+        "--compact",
+        action=argparse.BooleanOptionalAction,
+        help=f"Whether to use compact grid storage. Defaults to compact mazes from {COMPACT_SIZE}x{COMPACT_SIZE}.",
+    )
+    parser.add_argument(
+        "-i", "--imports", action="store_true", help="Also time the imports, and fail when one is over its budget."
+    )
+    parser.add_argument("-o", "--output", help="Where to write the JSON results. Defaults to stdout.")
+    parser.add_argument("-b", "--baseline", help="JSON results to compare against.")
+    parser.add_argument("-t", "--threshold", type=float, default=0.2, help="Allowed slowdown fraction. Defaults to 0.2.")
+    flags = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        tuple(flags.sizes), seed=flags.seed, repeat=flags.repeat, moves=flags.moves, compact=flags.compact
+    )
+    if flags.imports:
+        results += run_import_benchmarks(repeat=flags.repeat)
+
+    metadata = {"seed": flags.seed, "compact": flags.compact}
+    if flags.output:
+        with open(flags.output, "w") as fp:
+            dump(results, fp, **metadata)
+    else:
+        dump(results, sys.stdout, **metadata)
+        print()
+
+    for result in results:
+        print(
+            f"{result.key():>32} {result.seconds * 1000:>12.3f} ms {result.peak_bytes / 1024:>12.1f} KiB"
+            f" {result.allocated_blocks:>10} blocks",
+            file=sys.stderr,
+        )
+
+    failed = False
+    for result, budget in over_budget(results):
+        print(f"OVER BUDGET {result.key()}: {result.seconds * 1000:.3f} ms > {budget * 1000:.3f} ms", file=sys.stderr)
+        failed = True
+
+    if flags.baseline:
+        with open(flags.baseline) as fp:
+            regressions = compare(results, load(fp), flags.threshold)
+
+        for result, old in regressions:
+            print(
+                f"REGRESSION {result.key()}: {old.seconds * 1000:.3f} ms -> {result.seconds * 1000:.3f} ms,"
+                f" {old.peak_bytes} -> {result.peak_bytes} bytes peak",
+                file=sys.stderr,
+            )
+
+        if regressions:
+            return 1
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
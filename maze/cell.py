@@ -5,10 +5,17 @@ from typing import NamedTuple, Literal, TypeAlias, Callable, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .maze import Maze
+    from .world import World
 
 CardinalDirection: TypeAlias = Literal["N", "S", "E", "W"]
 CARDINAL_DIRECTIONS: list[CardinalDirection] = ["N", "S", "E", "W"]
 
+# Bit flags used when hallways are packed into an integer (see maze.grid).
+HALLWAY_FLAGS: dict[CardinalDirection, int] = {"N": 1, "S": 2, "E": 4, "W": 8}
+
+OPPOSITES: dict[CardinalDirection, CardinalDirection] = {"N": "S", "S": "N", "E": "W", "W": "E"}
+OFFSETS: dict[CardinalDirection, tuple[int, int]] = {"N": (0, -1), "S": (0, 1), "E": (1, 0), "W": (-1, 0)}
+
 # fmt: off
 
 def point_as_actual(update_func: Callable[[int, int], tuple[int, int]]):
@@ -45,16 +52,10 @@ class Point(NamedTuple):
             return self.x, self.y
         return self.x * 2, self.y * 2
 
-    def get(self, maze: Maze):
-        x, y = self.actual()
-        try:
-            if x < 0 or y < 0:
-                return None
-            return maze.grid[y][x]
-        except:
-            return None
+    def get(self, maze: Maze | World):
+        return maze.cell_at(*self.actual())
 
-    def set(self, maze: Maze, type: CellType):
+    def set(self, maze: Maze | World, type: CellType):
         cell = self.get(maze)
         if cell:
             cell.type = type
@@ -68,17 +69,17 @@ class Point(NamedTuple):
         return f"{type(self).__name__}({self.x//(self.is_actual + 1)}, {self.y//(self.is_actual + 1)})"
 
     def __eq__(self, other: object):
-        return isinstance(other, type(self)) and other.actual() == self.actual()
+        if not isinstance(other, type(self)):
+            return False
+        if other.is_actual is self.is_actual:
+            return other.x == self.x and other.y == self.y
+        return other.actual() == self.actual()
 
 
-class Hallways:
-    __slots__ = ("N", "S", "E", "W")
+class BaseHallways:
+    """Access by direction to the ``N``, ``S``, ``E`` and ``W`` hallways defined by subclasses."""
 
-    def __init__(self):
-        self.N: bool = False
-        self.S: bool = False
-        self.E: bool = False
-        self.W: bool = False
+    __slots__ = ()
 
     def __setitem__(self, *args):
         return self.__setattr__(*args)
@@ -87,6 +88,16 @@ class Hallways:
         return getattr(self, direction)
 
 
+class Hallways(BaseHallways):
+    __slots__ = ("N", "S", "E", "W")
+
+    def __init__(self):
+        self.N: bool = False
+        self.S: bool = False
+        self.E: bool = False
+        self.W: bool = False
+
+
 class Paths:
     __slots__ = ("N", "S", "E", "W")
 
@@ -112,23 +123,18 @@ class Cell:
         self.hallways = Hallways()
         self.paths = Paths()
 
-    def empty_neighbours(self, maze: Maze) -> list[tuple[Cell, CardinalDirection]]:
+    def empty_neighbours(self, maze: Maze | World) -> list[tuple[Cell, CardinalDirection]]:
         x, y = self.coord.actual()
         dirs: list[CardinalDirection] = ["N", "S", "W", "E"]
-        return [
-            (cell, dirs[index])
-            for index, cell in enumerate(
-                [
-                    Point(x, y - 2, is_actual=True).get(maze),
-                    Point(x, y + 2, is_actual=True).get(maze),
-                    Point(x - 2, y, is_actual=True).get(maze),
-                    Point(x + 2, y, is_actual=True).get(maze),
-                ]
-            )
-            if cell and cell.type == CellType.wall
-        ]
-
-    def fill_path_towards(self, maze: Maze, direction: CardinalDirection):
+        neighbours: list[tuple[Cell, CardinalDirection]] = []
+        for direction in dirs:
+            dx, dy = OFFSETS[direction]
+            cell = maze.cell_at(x + dx * 2, y + dy * 2)
+            if cell and cell.type == CellType.wall:
+                neighbours.append((cell, direction))
+        return neighbours
+
+    def fill_path_towards(self, maze: Maze | World, direction: CardinalDirection):
         if self.paths[direction] is not None:
             return self
 
@@ -137,9 +143,10 @@ class Cell:
             self.paths[direction] = self
             return
 
-        (left, right), next_func = intersections[direction]
-        current = self.coord
-        while next := next_func(current).get(maze):
+        (left, right), _ = intersections[direction]
+        dx, dy = OFFSETS[direction]
+        x, y = self.coord.actual()
+        while next := maze.cell_at(x := x + dx, y := y + dy):
             if next.hallways[left] or next.hallways[right] or next.type == CellType.end:
                 self.paths[direction] = next
                 break
@@ -148,13 +155,11 @@ class Cell:
                 # Dead end.
                 self.paths[direction] = next
                 break
-
-            current = next.coord
         else:
             # Dead end.
             self.paths[direction] = next
 
-    def fill_paths(self, maze: Maze):
+    def fill_paths(self, maze: Maze | World):
         if self.type is CellType.wall:
             return
         self.fill_path_towards(maze, "N")
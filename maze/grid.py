@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterator
+
+from .cell import (
+    BaseHallways,
+    Cell,
+    CellType,
+    Paths,
+    Point,
+    CardinalDirection,
+    HALLWAY_FLAGS,
+    OFFSETS,
+    OPPOSITES,
+    intersections,
+)
+
+if TYPE_CHECKING:
+    from .maze import Maze
+    from .viewport import Viewport
+    from .world import World
+
+__all__ = ("CompactGrid",)
+
+# Layout of a packed cell (one byte):
+#   bits 0-1: CellType value
+#   bits 2-5: N/S/E/W hallway flags (see HALLWAY_FLAGS)
+TYPE_MASK = 0b11
+HALLWAY_SHIFT = 2
+
+_CELL_TYPES = tuple(CellType)
+_END = CellType.end.value
+_WALL = CellType.wall.value
+_TILE = CellType.tile.value
+# Keeps only the type bits of a byte, for ``bytes.translate``.
+_TYPE_TABLE = bytes(value & TYPE_MASK for value in range(256))
+# Keeps only the hallway flags of a byte.
+_FLAGS_TABLE = bytes(value >> HALLWAY_SHIFT for value in range(256))
+
+
+class _HallwayFlag:
+    """The flag bit of one hallway in the byte of a :class:`HallwaysView`."""
+
+    __slots__ = ("flag",)
+
+    def __init__(self, direction: CardinalDirection):
+        self.flag = HALLWAY_FLAGS[direction] << HALLWAY_SHIFT
+
+    def __get__(self, view: HallwaysView, owner: type | None = None) -> bool:
+        return bool(view._data[view._index] & self.flag)
+
+    def __set__(self, view: HallwaysView, value: bool):
+        if value:
+            view._data[view._index] |= self.flag
+        else:
+            view._data[view._index] &= ~self.flag & 0xFF
+
+
+class HallwaysView(BaseHallways):
+    """Hallways that read and write the flag bits of a packed cell."""
+
+    __slots__ = ("_data", "_index")
+
+    def __init__(self, data: bytearray, index: int):
+        self._data = data
+        self._index = index
+
+    N = _HallwayFlag("N")
+    S = _HallwayFlag("S")
+    E = _HallwayFlag("E")
+    W = _HallwayFlag("W")
+
+
+class CellView(Cell):
+    """A lightweight :class:`Cell` over one byte of a :class:`CompactGrid`.
+
+    Views are created on demand and are not kept by the grid. Their
+    paths are computed lazily the first time they are accessed.
+    """
+
+    __slots__ = ("_data", "_index", "_source", "_paths", "_grid")
+
+    def __init__(self, source: Maze | World, data: bytearray, index: int, point: Point, grid: CompactGrid | None = None):
+        self._data = data
+        self._index = index
+        self._source = source
+        self._paths: Paths | None = None
+        # Set when ``data`` is the whole grid, so paths can be found by walking it directly.
+        self._grid = grid
+        self.coord = point
+
+    @property
+    def type(self) -> CellType:
+        return _CELL_TYPES[self._data[self._index] & TYPE_MASK]
+
+    @type.setter
+    def type(self, value: CellType):
+        self._data[self._index] = (self._data[self._index] & ~TYPE_MASK) | value.value
+
+    @property
+    def hallways(self) -> HallwaysView:
+        return HallwaysView(self._data, self._index)
+
+    @property
+    def paths(self) -> Paths:
+        if self._paths is None:
+            self._paths = Paths()
+            self.fill_paths(self._source)
+        return self._paths
+
+    def fill_path_towards(self, maze: Maze | World, direction: CardinalDirection):
+        grid = self._grid
+        if grid is None:
+            return super().fill_path_towards(maze, direction)
+
+        paths = self.paths
+        if paths[direction] is not None:
+            return self
+
+        data = self._data
+        flag = HALLWAY_FLAGS[direction] << HALLWAY_SHIFT
+        if not data[self._index] & flag:
+            # Dead end
+            paths[direction] = self
+            return
+
+        # Walk the packed cells by index. Only the target cell gets a view.
+        (left, right), _ = intersections[direction]
+        junction = (HALLWAY_FLAGS[left] | HALLWAY_FLAGS[right]) << HALLWAY_SHIFT
+        dx, dy = OFFSETS[direction]
+        stride = grid.strides[direction]
+        width, height = grid.width, grid.height
+        x, y = self.coord.actual()
+        index = self._index
+
+        while 0 <= (x := x + dx) < width and 0 <= (y := y + dy) < height:
+            index += stride
+            cell = data[index]
+            if cell & junction or cell & TYPE_MASK == _END or not cell & flag:
+                paths[direction] = grid.cell(x, y)
+                return
+
+        # Dead end.
+        paths[direction] = None
+
+
+class CompactRow:
+    __slots__ = ("grid", "y")
+
+    def __init__(self, grid: CompactGrid, y: int):
+        self.grid = grid
+        self.y = y
+
+    def __len__(self):
+        return self.grid.width
+
+    def __getitem__(self, x: int) -> Cell:
+        if not 0 <= x < self.grid.width:
+            raise IndexError("row index out of range")
+        return self.grid.cell(x, self.y)
+
+    def __iter__(self) -> Iterator[Cell]:
+        for x in range(self.grid.width):
+            yield self.grid.cell(x, self.y)
+
+
+class CompactGrid:
+    """Stores a maze grid as one byte per cell.
+
+    Behaves like the ``list[list[Cell]]`` grid used by default: indexing
+    a row and then a column returns a :class:`CellView`.
+    """
+
+    __slots__ = ("source", "width", "height", "data", "strides", "__weakref__")
+
+    def __init__(self, source: Maze, width: int, height: int):
+        self.source = source
+        self.width = width
+        self.height = height
+        self.data = bytearray([CellType.wall.value]) * (width * height)
+        # How much the index of a cell changes when moving once towards every direction.
+        self.strides: dict[CardinalDirection, int] = {"N": -width, "S": width, "E": 1, "W": -1}
+
+    def cell(self, x: int, y: int) -> Cell:
+        """Creates a view of the cell at the given actual coordinates. Does not check bounds."""
+        return CellView(self.source, self.data, y * self.width + x, Point(x, y, is_actual=True), self)
+
+    def carve(self, x: int, y: int, direction: CardinalDirection):
+        """Opens a hallway from the tile at the actual coordinates ``x, y``. See :meth:`Maze.carve`."""
+        dx, dy = OFFSETS[direction]
+        if not (
+            0 <= x < self.width and 0 <= y < self.height and 0 <= x + dx * 2 < self.width and 0 <= y + dy * 2 < self.height
+        ):
+            raise ValueError(f"Cannot carve {direction} from {Point(x, y, is_actual=True)}: out of bounds.")
+
+        data = self.data
+        stride = self.strides[direction]
+        index = y * self.width + x
+        flag = HALLWAY_FLAGS[direction] << HALLWAY_SHIFT
+        opposite = HALLWAY_FLAGS[OPPOSITES[direction]] << HALLWAY_SHIFT
+
+        for index, flags in ((index, flag), (index + stride, flag | opposite), (index + stride * 2, opposite)):
+            cell = data[index]
+            if cell & TYPE_MASK == _WALL:
+                cell = cell & ~TYPE_MASK | _TILE
+            data[index] = cell | flags
+
+    def hallway_flags(self) -> bytearray:
+        """The hallway flags of every tile, row by row. See :meth:`Maze.hallway_flags`."""
+        width, height = (self.width + 1) // 2, (self.height + 1) // 2
+        flags = bytearray(width * height)
+        for y in range(height):
+            row = self.data[y * 2 * self.width : (y * 2 + 1) * self.width : 2]
+            flags[y * width : (y + 1) * width] = row.translate(_FLAGS_TABLE)
+        return flags
+
+    def type_codes(self, viewport: Viewport | None = None) -> list[bytes]:
+        """The :class:`CellType` value of every cell, one row per item. See :meth:`Maze.type_codes`."""
+        x, y, width, height = viewport or (0, 0, self.width, self.height)
+        return [
+            bytes(self.data[row * self.width + x : row * self.width + x + width].translate(_TYPE_TABLE))
+            for row in range(y, y + height)
+        ]
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, y: int) -> CompactRow:
+        if not 0 <= y < self.height:
+            raise IndexError("grid index out of range")
+        return CompactRow(self, y)
+
+    def __iter__(self) -> Iterator[CompactRow]:
+        for y in range(self.height):
+            yield CompactRow(self, y)
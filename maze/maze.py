@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-from collections import deque
+import os
 import random
-from typing import NamedTuple
+from typing import NamedTuple, Sequence
 
-from .cell import Cell, Point, CellType
+from . import profiling
+from .algorithms import ALGORITHMS, GenerationAlgorithm
+from .cell import Cell, Point, CellType, CardinalDirection, intersections, OFFSETS, OPPOSITES, HALLWAY_FLAGS
+from .grid import CompactGrid
+from .viewport import Viewport
 
 __all__ = ("Size", "Maze")
 
@@ -13,10 +17,45 @@ class Size(NamedTuple):
     width: int
     height: int
 
+    @classmethod
+    def parse(cls, value: str) -> Size:
+        """Reads a size written as ``WIDTHxHEIGHT``, or ``WIDTH`` for a square."""
+        width, _, height = value.lower().partition("x")
+        size = cls(int(width), int(height or width))
+        if size.width < 1 or size.height < 1:
+            raise ValueError(f"A maze needs at least one tile on each side, got {value!r}.")
+        return size
+
 
 class Maze:
-    def __init__(self, size: Size) -> None:
+    """A maze of ``size`` tiles.
+
+    size: Size
+        The amount of tiles (not counting walls) of the maze.
+    compact: bool
+        Whether to store the grid as one byte per cell instead of one
+        :class:`Cell` object per cell. Cells are then created on demand.
+    seed: int | None
+        The seed of the maze. Mazes with the same size, seed and
+        generation algorithm are identical.
+    rng: random.Random | None
+        The random number generator used to place the start and end
+        points and to generate the maze. Takes precedence over ``seed``.
+        Defaults to a new one seeded with ``seed``.
+    """
+
+    def __init__(
+        self,
+        size: Size,
+        *,
+        compact: bool = False,
+        seed: int | None = None,
+        rng: random.Random | None = None,
+    ) -> None:
         self.size = size
+        self.compact = compact
+        self.seed = seed
+        self.rng = rng or random.Random(seed)
 
         # The actual grid will be double the size:
         # Even indices will be tiles.
@@ -25,90 +64,214 @@ class Maze:
             width=(size.width * 2) - 1,
             height=(size.height * 2) - 1,
         )
-        self.grid: list[list[Cell]] = []
+        self.grid: list[list[Cell]] | CompactGrid = []
 
-        self.start = Point(random.randint(0, self.size.width - 1), 0)
-        self.end = Point(random.randint(0, self.size.width - 1), self.size.height - 1)
+        self.start = Point(self.rng.randint(0, self.size.width - 1), 0)
+        self.end = Point(self.rng.randint(0, self.size.width - 1), self.size.height - 1)
 
     @property
     def generated(self):
         """:class:`bool` Whether the bot has been generated."""
         return not not self.grid
 
-    def generate(self):
-        """Generates the maze using a randomized depth-first algorithm.
+    def cell_at(self, x: int, y: int) -> Cell | None:
+        """Returns the cell at the given actual coordinates, or ``None`` if they are out of bounds."""
+        if not self.grid or not (0 <= x < self._actual_size.width and 0 <= y < self._actual_size.height):
+            return None
+        if isinstance(self.grid, CompactGrid):
+            return self.grid.cell(x, y)
+        return self.grid[y][x]
+
+    def generate(self, algorithm: str | GenerationAlgorithm = "dfs"):
+        """Generates the maze.
+
+        algorithm: str | GenerationAlgorithm
+            The name of one of the :data:`ALGORITHMS` or a callable that
+            carves the maze through :meth:`carve`. Defaults to a randomized
+            depth-first search.
+        """
+        if isinstance(algorithm, str):
+            try:
+                algorithm = ALGORITHMS[algorithm]
+            except KeyError:
+                raise ValueError(f"Unknown generation algorithm: {algorithm!r}") from None
+
+        with profiling.allocated():
+            with profiling.section("generate.allocate"):
+                if self.compact:
+                    self.grid = CompactGrid(self, self._actual_size.width, self._actual_size.height)
+                else:
+                    self.grid = [
+                        [Cell(type=CellType.wall, point=Point(x, y, is_actual=True)) for x in range(self._actual_size.width)]
+                        for y in range(self._actual_size.height)
+                    ]
+
+            self.start.set(self, CellType.start)
+
+            with profiling.section("generate.carve"):
+                algorithm(self)
+
+            self.end.set(self, CellType.end)
+
+            with profiling.section("generate.fill_paths"):
+                self.fill_paths()
+
+        profiling.count("cells", self._actual_size.width * self._actual_size.height)
+
+    def hallway_flags(self) -> bytearray:
+        """The :data:`HALLWAY_FLAGS` of every tile, row by row, in logical coordinates."""
+        if isinstance(self.grid, CompactGrid):
+            return self.grid.hallway_flags()
+
+        width, height = self.size
+        flags = bytearray(width * height)
 
-        https://en.wikipedia.org/wiki/Maze_generation_algorithm
+        for y in range(height):
+            for x, cell in enumerate(self.grid[y * 2][::2]):
+                hallways = cell.hallways
+                flags[y * width + x] = (
+                    hallways.N * HALLWAY_FLAGS["N"]
+                    | hallways.S * HALLWAY_FLAGS["S"]
+                    | hallways.E * HALLWAY_FLAGS["E"]
+                    | hallways.W * HALLWAY_FLAGS["W"]
+                )
+        return flags
 
-        How it works:
-        First, you have a stack of cells. Initially
-        it only contains the starting point.
+    def type_codes(self, viewport: Viewport | None = None) -> list[bytes]:
+        """The :class:`CellType` value of every cell in actual coordinates, one row per item.
 
-        - Visit the last cell of the stack.
-        - Find a random neighbour that has not been visited.
-          - if found, push neighbour to stack and draw
-            a path to it, thus marking it as visited.
-          - else, backtrack (pop from stack) and goto point 1.
+        Only the cells inside ``viewport`` if given, which must lie within the maze."""
+        if isinstance(self.grid, CompactGrid):
+            return self.grid.type_codes(viewport)
 
-        The algorithm finishes when the stack is exhausted."""
-        self.grid = [
-            [Cell(type=CellType.wall, point=Point(x, y, is_actual=True)) for x in range(self._actual_size.width)]
-            for y in range(self._actual_size.height)
-        ]
+        x, y, width, height = viewport or (0, 0, *self._actual_size)
+        return [bytes(cell.type.value for cell in row[x : x + width]) for row in self.grid[y : y + height]]
 
-        self.start.set(self, CellType.start)
+    @classmethod
+    def from_hallway_flags(
+        cls,
+        size: Size,
+        flags: Sequence[int],
+        *,
+        start: Point,
+        end: Point,
+        compact: bool = False,
+        seed: int | None = None,
+    ) -> Maze:
+        """Builds a generated maze from the flags returned by :meth:`hallway_flags`."""
+        if len(flags) != size.width * size.height:
+            raise ValueError(f"Expected {size.width * size.height} hallway flags, got {len(flags)}.")
 
-        stack: deque[Cell] = deque()
-        start = self.start.get(self)
+        maze = cls(size, compact=compact, seed=seed)
+        maze.start, maze.end = start, end
 
-        if start:
-            stack.append(start)
+        east, south = HALLWAY_FLAGS["E"], HALLWAY_FLAGS["S"]
 
-        while stack:
-            current = stack[-1]
+        def carve_flags(maze: Maze):
+            for index, flag in enumerate(flags):
+                y, x = divmod(index, size.width)
+                if flag & east:
+                    maze.carve(x, y, "E")
+                if flag & south:
+                    maze.carve(x, y, "S")
 
-            neighbours = current.empty_neighbours(self)
+        maze.generate(carve_flags)
+        return maze
 
-            if not neighbours:
-                stack.pop()
-                continue
+    def save(self, path: str | os.PathLike[str]):
+        """Saves the maze to a file in the :mod:`maze.storage` format."""
+        from .storage import MazeRecord, write_header
 
-            next, direction = random.choice(neighbours)
-            next.type = CellType.tile
-            x, y = current.coord.midway(next.coord)
-            midway = self.grid[y][x]
-            midway.type = CellType.tile
+        if not self.generated:
+            raise RuntimeError("Cannot save a non-generated map.")
 
-            # Set the directions that we can go towards.
-            match direction:
-                case "N":
-                    current.hallways.N = True
-                    next.hallways.S = True
-                    midway.hallways.N = True
-                    midway.hallways.S = True
+        # Before opening the file, which is not touched if the maze cannot be stored.
+        record = MazeRecord.from_maze(self).to_bytes()
+        with open(path, "wb") as fp:
+            write_header(fp)
+            fp.write(record)
 
-                case "S":
-                    current.hallways.S = True
-                    next.hallways.N = True
-                    midway.hallways.N = True
-                    midway.hallways.S = True
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> Maze:
+        """Opens a maze saved with :meth:`save`.
 
-                case "W":
-                    current.hallways.W = True
-                    next.hallways.E = True
-                    midway.hallways.W = True
-                    midway.hallways.E = True
+        The file is memory-mapped and cells are decoded only when they are
+        accessed, so opening is instant regardless of the size of the maze.
+        The cells of a loaded maze are read-only."""
+        from .storage import open_packed
 
-                case "E":
-                    current.hallways.E = True
-                    next.hallways.W = True
-                    midway.hallways.W = True
-                    midway.hallways.E = True
+        return open_packed(cls, path)
 
-            stack.append(next)
+    def carve(self, x: int, y: int, direction: CardinalDirection):
+        """Opens a hallway from the tile at the logical coordinates ``x, y`` towards ``direction``.
 
-        self.end.set(self, CellType.end)
+        Both tiles and the corridor between them stop being walls."""
+        if isinstance(self.grid, CompactGrid):
+            return self.grid.carve(x * 2, y * 2, direction)
+
+        dx, dy = OFFSETS[direction]
+        x, y = x * 2, y * 2
+        width, height = self._actual_size
+
+        if not (0 <= x < width and 0 <= y < height and 0 <= x + dx * 2 < width and 0 <= y + dy * 2 < height):
+            raise ValueError(f"Cannot carve {direction} from {Point(x, y, is_actual=True)}: out of bounds.")
+
+        grid = self.grid
+        current = grid[y][x]
+        midway = grid[y + dy][x + dx]
+        next = grid[y + dy * 2][x + dx * 2]
+
+        for cell in (current, midway, next):
+            if cell.type is CellType.wall:
+                cell.type = CellType.tile
+
+        opposite = OPPOSITES[direction]
+
+        # Set the directions that we can go towards.
+        current.hallways[direction] = True
+        next.hallways[opposite] = True
+        midway.hallways[direction] = True
+        midway.hallways[opposite] = True
+
+    def _fill_line(self, line: Sequence[Cell], direction: CardinalDirection):
+        """Fills the paths towards ``direction`` of a row or column whose
+        cells are ordered towards ``direction``.
+
+        The line is swept backwards, so every tile can reuse the target
+        of the tile right after it instead of walking the corridor again."""
+        (left, right), _ = intersections[direction]
+        after: Cell | None = None
+
+        for cell in reversed(line):
+            if cell.type is not CellType.wall:
+                if not cell.hallways[direction]:
+                    cell.paths[direction] = cell
+                elif after is not None:
+                    if (
+                        after.hallways[left]
+                        or after.hallways[right]
+                        or after.type is CellType.end
+                        or not after.hallways[direction]
+                    ):
+                        cell.paths[direction] = after
+                    else:
+                        cell.paths[direction] = after.paths[direction]
+            after = cell
+
+    def fill_paths(self):
+        """Fills the paths of every tile in the maze.
+
+        Equivalent to calling :meth:`Cell.fill_paths` on every cell, but
+        runs in a single sweep per row and column. Compact grids fill their
+        paths lazily, so this does nothing for them."""
+        if isinstance(self.grid, CompactGrid):
+            return
 
         for row in self.grid:
-            for tile in row:
-                tile.fill_paths(self)
+            self._fill_line(row, "E")
+            self._fill_line(row[::-1], "W")
+
+        for x in range(self._actual_size.width):
+            column = [row[x] for row in self.grid]
+            self._fill_line(column, "S")
+            self._fill_line(column[::-1], "N")
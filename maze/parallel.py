@@ -0,0 +1,269 @@
+"""Generation of large mazes in parallel, one tile at a time.
+
+:class:`TiledGenerator` is a generation algorithm, see :meth:`Maze.generate`::
+
+    maze = Maze(Size(5000, 5000), compact=True, seed=1)
+    maze.generate(TiledGenerator(Size(256, 256), processes=8))
+
+:class:`ProgressiveGenerator` only generates the tile holding the start
+right away, and the rest of the maze in the background::
+
+    generator = ProgressiveGenerator()
+    maze.generate(generator)
+    async for progress in generator.reveal():
+        ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import Pool
+from typing import AsyncIterator, Iterable, Iterator, NamedTuple
+
+from .algorithms import DisjointSet, GenerationAlgorithm
+from .cell import CellType, HALLWAY_FLAGS
+from .grid import CompactGrid, HALLWAY_SHIFT, TYPE_MASK
+from .maze import Maze, Size
+
+__all__ = ("TiledGenerator", "ProgressiveGenerator")
+
+# Turns the start and the end of a tile into plain tiles, for ``bytes.translate``.
+_PLAIN_TILES = bytes(
+    value & ~TYPE_MASK | CellType.tile.value if value & TYPE_MASK in (CellType.start.value, CellType.end.value) else value
+    for value in range(256)
+)
+
+
+class _Tile(NamedTuple):
+    x: int
+    y: int
+    size: Size
+    seed: int
+    algorithm: str | GenerationAlgorithm
+
+
+def _carve_tile(tile: _Tile) -> bytes:
+    """Generates a tile as a maze of its own, and returns its compact grid."""
+    maze = Maze(tile.size, compact=True, seed=tile.seed)
+    maze.generate(tile.algorithm)
+    assert isinstance(maze.grid, CompactGrid)
+    return bytes(maze.grid.data).translate(_PLAIN_TILES)
+
+
+def _join(maze: Maze, tile: _Tile, other: _Tile):
+    """Opens a hallway at a random place of the boundary between a tile and the one on its right or below it."""
+    if other.x != tile.x:
+        y = tile.y + maze.rng.randrange(tile.size.height)
+        maze.carve(other.x - 1, y, "E")
+    else:
+        x = tile.x + maze.rng.randrange(tile.size.width)
+        maze.carve(x, other.y - 1, "S")
+
+
+class TiledGenerator:
+    """Splits the maze into tiles that are generated as independent perfect
+    mazes in a process pool, then joins them into one perfect maze.
+
+    The tiles are joined along a random spanning tree of the tile grid, with
+    exactly one hallway across every boundary of the tree, so the maze has
+    no loops and no isolated regions.
+
+    tile_size: Size
+        The size in tiles of every part. The ones on the right and bottom
+        edges may be smaller.
+    algorithm: str | GenerationAlgorithm
+        The algorithm used for every part. A callable must be picklable.
+    processes: int | None
+        The amount of worker processes, one per core by default. With ``1``
+        the parts are generated in this process.
+    """
+
+    def __init__(
+        self, tile_size: Size = Size(256, 256), algorithm: str | GenerationAlgorithm = "dfs", processes: int | None = None
+    ):
+        if tile_size.width < 1 or tile_size.height < 1:
+            raise ValueError("tile_size must be at least 1x1.")
+        self.tile_size = tile_size
+        self.algorithm = algorithm
+        self.processes = processes
+
+    def _tiles(self, maze: Maze) -> list[_Tile]:
+        width, height = maze.size
+        tile_width, tile_height = self.tile_size
+        return [
+            _Tile(
+                x,
+                y,
+                Size(min(tile_width, width - x), min(tile_height, height - y)),
+                maze.rng.getrandbits(64),
+                self.algorithm,
+            )
+            for y in range(0, height, tile_height)
+            for x in range(0, width, tile_width)
+        ]
+
+    def _generate(self, tiles: list[_Tile]) -> Iterator[bytes]:
+        if self.processes == 1 or len(tiles) == 1:
+            yield from map(_carve_tile, tiles)
+            return
+
+        with Pool(self.processes) as pool:
+            yield from pool.imap(_carve_tile, tiles)
+
+    def _paste(self, maze: Maze, tile: _Tile, data: bytes):
+        """Copies the grid of a tile into the maze."""
+        tile_width = tile.size.width * 2 - 1
+        if isinstance(maze.grid, CompactGrid):
+            grid = maze.grid
+            for row in range(tile.size.height * 2 - 1):
+                start = (tile.y * 2 + row) * grid.width + tile.x * 2
+                grid.data[start : start + tile_width] = data[row * tile_width : (row + 1) * tile_width]
+            return
+
+        east, south = HALLWAY_FLAGS["E"], HALLWAY_FLAGS["S"]
+        for y in range(tile.size.height):
+            for x in range(tile.size.width):
+                flags = data[y * 2 * tile_width + x * 2] >> HALLWAY_SHIFT
+                if flags & east:
+                    maze.carve(tile.x + x, tile.y + y, "E")
+                if flags & south:
+                    maze.carve(tile.x + x, tile.y + y, "S")
+
+    def _stitch(self, maze: Maze, tiles: Iterable[_Tile]):
+        """Opens one hallway across every boundary of a random spanning tree of the tiles."""
+        by_position = {(tile.x, tile.y): tile for tile in tiles}
+        index = {position: number for number, position in enumerate(by_position)}
+        tile_width, tile_height = self.tile_size
+
+        boundaries: list[tuple[_Tile, _Tile]] = []
+        for (x, y), tile in by_position.items():
+            if (right := by_position.get((x + tile_width, y))) is not None:
+                boundaries.append((tile, right))
+            if (below := by_position.get((x, y + tile_height))) is not None:
+                boundaries.append((tile, below))
+        maze.rng.shuffle(boundaries)
+
+        sets = DisjointSet(len(by_position))
+        for tile, other in boundaries:
+            if sets.union(index[tile.x, tile.y], index[other.x, other.y]):
+                _join(maze, tile, other)
+
+    def __call__(self, maze: Maze):
+        tiles = self._tiles(maze)
+        for tile, data in zip(tiles, self._generate(tiles)):
+            self._paste(maze, tile, data)
+        self._stitch(maze, tiles)
+
+        # The tiles were pasted over the start.
+        maze.start.set(maze, CellType.start)
+
+
+class ProgressiveGenerator(TiledGenerator):
+    """Generates a compact maze tile by tile, from the tile holding the start outwards.
+
+    As a generation algorithm, it only generates the tile holding the start,
+    so the maze can be played right away. The other tiles are generated by
+    :meth:`reveal` in the background, or by :meth:`finish`. Every tile is
+    joined to one of the tiles next to it that were added before, so the
+    maze stays perfect while it grows. Tiles that were not added yet are
+    walls.
+
+    Takes the same arguments as :class:`TiledGenerator`, with smaller tiles
+    by default so the first one is ready sooner.
+    """
+
+    def __init__(
+        self, tile_size: Size = Size(32, 32), algorithm: str | GenerationAlgorithm = "dfs", processes: int | None = None
+    ):
+        super().__init__(tile_size, algorithm, processes)
+        self.maze: Maze | None = None
+        # The tiles left to add, in the order they are added.
+        self.pending: deque[_Tile] = deque()
+        self.total = 0
+        self._added: dict[tuple[int, int], _Tile] = {}
+
+    @property
+    def done(self) -> bool:
+        return not self.pending
+
+    @property
+    def progress(self) -> float:
+        """The part of the tiles that were added, from 0 to 1."""
+        return 1 - len(self.pending) / self.total if self.total else 0.0
+
+    def __call__(self, maze: Maze):
+        if not isinstance(maze.grid, CompactGrid):
+            raise ValueError("Progressive generation requires a compact maze.")
+
+        tiles = self._tiles(maze)
+        tile_width, tile_height = self.tile_size
+        start_x, start_y = maze.start.actual()
+        first_x, first_y = start_x // 2 // tile_width, start_y // 2 // tile_height
+        # Closest to the start first. Every tile then has a neighbour that was added before it.
+        tiles.sort(key=lambda tile: abs(tile.x // tile_width - first_x) + abs(tile.y // tile_height - first_y))
+
+        self.maze = maze
+        self.pending = deque(tiles)
+        self.total = len(tiles)
+        self._added.clear()
+        self.add(_carve_tile(tiles[0]))
+
+    def add(self, data: bytes):
+        """Adds the next pending tile, generated as ``data``, and joins it to the maze."""
+        maze = self.maze
+        assert maze is not None
+        tile = self.pending.popleft()
+        self._paste(maze, tile, data)
+
+        tile_width, tile_height = self.tile_size
+        neighbours = [
+            neighbour
+            for position in (
+                (tile.x - tile_width, tile.y),
+                (tile.x + tile_width, tile.y),
+                (tile.x, tile.y - tile_height),
+                (tile.x, tile.y + tile_height),
+            )
+            if (neighbour := self._added.get(position)) is not None
+        ]
+        if neighbours:
+            other = maze.rng.choice(neighbours)
+            # Joined from the tile on the left or above.
+            if other.x < tile.x or other.y < tile.y:
+                _join(maze, other, tile)
+            else:
+                _join(maze, tile, other)
+        self._added[tile.x, tile.y] = tile
+
+        # The tile was pasted over the start or the end.
+        for point, type in ((maze.start, CellType.start), (maze.end, CellType.end)):
+            x, y = point.actual()
+            if tile.x <= x // 2 < tile.x + tile.size.width and tile.y <= y // 2 < tile.y + tile.size.height:
+                point.set(maze, type)
+
+    def finish(self):
+        """Generates and adds every pending tile in this process."""
+        while self.pending:
+            self.add(_carve_tile(self.pending[0]))
+
+    async def reveal(self, executor: Executor | None = None) -> AsyncIterator[float]:
+        """Generates the pending tiles in ``executor`` and adds them in order, yielding the progress after each one.
+
+        Defaults to a process pool of ``processes`` workers, or to a thread
+        with ``processes=1``. Tiles that were not added when the iteration
+        stops are cancelled."""
+        loop = asyncio.get_running_loop()
+        owned = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(1) if self.processes == 1 else ProcessPoolExecutor(self.processes)
+
+        try:
+            futures = [loop.run_in_executor(executor, _carve_tile, tile) for tile in self.pending]
+            for future in futures:
+                self.add(await future)
+                yield self.progress
+        finally:
+            if owned:
+                executor.shutdown(wait=False, cancel_futures=True)
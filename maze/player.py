@@ -1,19 +1,28 @@
 from __future__ import annotations
 
-from collections import deque
-from itertools import pairwise
+from collections import deque, OrderedDict
 
 from .maze import Maze
+from .world import World
 from .theme import Theme, DEFAULT_THEME
-from .cell import Cell, CardinalDirection, intersections, CARDINAL_DIRECTIONS, CellType
+from .cell import Cell, CardinalDirection, CARDINAL_DIRECTIONS, CellType, OFFSETS
+from .trail import Trail
+from .viewport import Viewport
 
 __all__ = ("Player",)
 
 
+# An arrow at the given actual coordinates, pointing towards a direction.
+Arrow = tuple[int, int, CardinalDirection]
+
+
 class Player:
+    # The amount of positions whose look-ahead is cached.
+    LOOK_AHEAD_CACHE_SIZE: int = 64
+
     def __init__(
         self,
-        maze: Maze,
+        maze: Maze | World,
         theme: Theme = DEFAULT_THEME,
         look_behind: int | None = None,
         look_ahead: int = 3,
@@ -22,117 +31,263 @@ class Player:
         if not start:
             raise RuntimeError("Passed a non-generated map.")
 
-        self.maze: Maze = maze
+        self.maze: Maze | World = maze
         self.cell: Cell = start
         self.snap: bool = True
         self.theme: Theme = theme
         self.look_ahead: int = look_ahead
         self.moves: deque[Cell] = deque(maxlen=look_behind)
+        # The segments between the moves, kept up to date by ``move``.
+        self.trail = Trail()
+        # The theme, grid and viewport of the cached full visibility frame, its rows and their joined lines.
+        self._base: tuple[Theme, object, Viewport, list[list[str]], list[str]] | None = None
+        # The top left corner, in actual coordinates, of the frame being drawn.
+        self._origin: tuple[int, int] = (0, 0)
+        # The segments and arrows ahead of recent positions, see ``_look_ahead``.
+        self._look_ahead_cache: OrderedDict[tuple, tuple[list[tuple[int, int, int, int]], list[Arrow]]] = OrderedDict()
+
+        if isinstance(maze, World):
+            maze.visit(start.coord)
 
     @property
     def won(self):
         """Whether the player is in the final tile."""
         return self.cell.coord == self.maze.end
 
+    def invalidate(self):
+        """Forgets what was cached about the maze, after its hallways changed.
+
+        See :class:`maze.parallel.ProgressiveGenerator`."""
+        self._base = None
+        self._look_ahead_cache.clear()
+        if isinstance(self.maze, Maze) and (cell := self.maze.cell_at(*self.cell.coord.actual())) is not None:
+            self.cell = cell
+
     def draw_segment(self, display_maze: list[list[str]], current: Cell, next: Cell, character: str):
-        x_1, y_1 = current.coord.actual()
-        x_2, y_2 = next.coord.actual()
+        self._draw_rectangle(display_maze, *current.coord.actual(), *next.coord.actual(), character)
 
+    def _draw_rectangle(self, display_maze: list[list[str]], x_1: int, y_1: int, x_2: int, y_2: int, character: str):
         if x_1 > x_2:
             x_1, x_2 = x_2, x_1
 
         if y_1 > y_2:
             y_1, y_2 = y_2, y_1
 
-        for x in range(x_1, x_2 + 1):
-            for y in range(y_1, y_2 + 1):
-                display_maze[y][x] = character
+        # Only the part inside the frame.
+        left, top = self._origin
+        right, bottom = left + len(display_maze[0]) - 1, top + len(display_maze) - 1
 
-    def draw_possible_paths(self, display_maze: list[list[str]], previous: Cell | None, current: Cell):
+        for x in range(max(x_1, left), min(x_2, right) + 1):
+            for y in range(max(y_1, top), min(y_2, bottom) + 1):
+                display_maze[y - top][x - left] = character
+
+    def _draw_point(self, display_maze: list[list[str]], x: int, y: int, character: str):
+        x, y = x - self._origin[0], y - self._origin[1]
+        if 0 <= y < len(display_maze) and 0 <= x < len(display_maze[y]):
+            display_maze[y][x] = character
+
+    @staticmethod
+    def _arrows(previous: Cell | None, current: Cell) -> list[Arrow]:
+        """The arrows towards the directions that can be taken from ``current``, other than back to ``previous``."""
+        arrows: list[Arrow] = []
         for direction in CARDINAL_DIRECTIONS:
             if current.paths[direction] != previous and current.hallways[direction]:
-                _, next_tile = intersections[direction]
-                x, y = current.coord.midway(next_tile(current.coord))
-                display_maze[y][x] = self.theme.direction(direction)
+                # Same as ``Point.midway`` of the cell and the next one.
+                x, y = current.coord.actual()
+                dx, dy = OFFSETS[direction]
+                arrows.append(((x * 2 + dx) // 2, (y * 2 + dy) // 2, direction))
+        return arrows
 
-    def add_paths(self, display_maze: list[list[str]], *, previous: Cell | None, current: Cell, depth: int = 0):
-        """Recursively draw paths towards next directions."""
-        if depth == self.look_ahead:
-            self.draw_possible_paths(display_maze, previous, current)
-        else:
-            for direction in CARDINAL_DIRECTIONS:
-                if (next := current.paths[direction]) and next != previous and next != current:
-                    self.draw_segment(display_maze, current, next, self.theme.tile)
-                    self.add_paths(display_maze, previous=current, current=next, depth=depth + 1)
+    def draw_possible_paths(self, display_maze: list[list[str]], previous: Cell | None, current: Cell):
+        for x, y, direction in self._arrows(previous, current):
+            self._draw_point(display_maze, x, y, self.theme.direction(direction))
+
+    def _look_ahead(
+        self, previous: Cell | None, current: Cell, depth: int
+    ) -> tuple[list[tuple[int, int, int, int]], list[Arrow]]:
+        """The segments and the arrows ahead of ``current``, up to ``depth`` nodes of the junction graph away.
+
+        Found with a breadth-first search that visits every node once, and
+        cached for the most recent positions."""
+        grid = self.maze if isinstance(self.maze, World) else self.maze.grid
+        key = (current.coord.actual(), previous and previous.coord.actual(), depth, id(grid))
+        try:
+            self._look_ahead_cache.move_to_end(key)
+            return self._look_ahead_cache[key]
+        except KeyError:
+            pass
+
+        segments: list[tuple[int, int, int, int]] = []
+        visited = {current.coord.actual()}
+        frontier: list[tuple[Cell | None, Cell]] = [(previous, current)]
+
+        for _ in range(depth):
+            next_frontier: list[tuple[Cell | None, Cell]] = []
+            for before, cell in frontier:
+                for direction in CARDINAL_DIRECTIONS:
+                    if (next := cell.paths[direction]) and next != before and next != cell:
+                        segments.append((*cell.coord.actual(), *next.coord.actual()))
+                        if (position := next.coord.actual()) not in visited:
+                            visited.add(position)
+                            next_frontier.append((cell, next))
+            frontier = next_frontier
+
+        arrows = [arrow for before, cell in frontier for arrow in self._arrows(before, cell)]
+        self._look_ahead_cache[key] = (segments, arrows)
+        if len(self._look_ahead_cache) > self.LOOK_AHEAD_CACHE_SIZE:
+            self._look_ahead_cache.popitem(last=False)
+        return segments, arrows
 
-    def render(self, lpadding: str = "", console_clear_sequence: str = ""):
-        display_maze = [[self.theme.get(CellType.wall) for _ in row] for row in self.maze.grid]
+    def add_paths(self, display_maze: list[list[str]], *, previous: Cell | None, current: Cell, depth: int = 0):
+        """Draws the paths ahead of ``current``, ``look_ahead - depth`` nodes away, with arrows at their ends."""
+        segments, arrows = self._look_ahead(previous, current, self.look_ahead - depth)
+        for segment in segments:
+            self._draw_rectangle(display_maze, *segment, self.theme.tile)
+        for x, y, direction in arrows:
+            self._draw_point(display_maze, x, y, self.theme.direction(direction))
+
+    def draw_static(self, display_maze: list[list[str]]):
+        """Draws the start, the end and the player."""
+        self._draw_point(display_maze, *self.maze.start.actual(), self.theme.start)
+
+        if self.maze.end:
+            self._draw_point(display_maze, *self.maze.end.actual(), self.theme.end)
+
+        self._draw_point(display_maze, *self.cell.coord.actual(), self.theme.player)
+
+    def _viewport(self, viewport: Viewport | None) -> Viewport:
+        if viewport is not None:
+            return viewport
+        if isinstance(self.maze, World):
+            raise ValueError("An infinite world can only be drawn inside a viewport.")
+        return Viewport(0, 0, *self.maze._actual_size)
+
+    def compose(self, viewport: Viewport | None = None) -> list[list[str]]:
+        """Builds the partial visibility frame: the trail and the paths ahead of the player.
+
+        Only the cells inside ``viewport`` are drawn, see :class:`Camera`.
+        Defaults to the whole maze.
+
+        The frame starts as walls, and only the trail and the paths ahead are
+        drawn over them, a few cells each. That is cheaper than mapping every
+        cell through :meth:`Theme.compile` like :meth:`compose_full`."""
+        viewport = self._viewport(viewport)
+        self._origin = (viewport.x, viewport.y)
+        display_maze = [[self.theme.get(CellType.wall)] * viewport.width for _ in range(viewport.height)]
 
         try:
             previous = self.moves[-2]
         except:
             previous = None
 
-        for prev, curr in pairwise(self.moves):
-            self.draw_possible_paths(display_maze, None, curr)
-            self.draw_segment(display_maze, prev, curr, self.theme.trail)
+        if len(self.trail) != max(0, len(self.moves) - 1):
+            # The moves were changed by hand.
+            self.trail.rebuild(self.moves)
+        self.trail.draw(display_maze, self._origin, self.theme)
 
         self.add_paths(display_maze, previous=previous, current=self.cell)
 
-        # Render static elements
-        x, y = self.maze.start.actual()
-        display_maze[y][x] = self.theme.start
-
-        x, y = self.maze.end.actual()
-        display_maze[y][x] = self.theme.end
-
-        x, y = self.cell.coord.actual()
-        display_maze[y][x] = self.theme.player
-
-        # Print everything.
+        self.draw_static(display_maze)
+        return display_maze
+
+    def _base_frame(self, viewport: Viewport) -> tuple[list[list[str]], list[str]]:
+        """The rows of the full visibility frame without the player, and their joined lines.
+
+        Built by mapping the cell types through the compiled theme, and
+        cached until the theme, the grid or the viewport changes."""
+        # The chunks of a world never change.
+        grid = self.maze if isinstance(self.maze, World) else self.maze.grid
+        base = self._base
+        if base is None or base[0] != self.theme or base[1] is not grid or base[2] != viewport:
+            table = self.theme.compile()
+            rows = [list(map(table.__getitem__, codes)) for codes in self.maze.type_codes(viewport)]
+            base = self._base = (self.theme, grid, viewport, rows, ["".join(row) for row in rows])
+        return base[3], base[4]
+
+    def compose_full(self, viewport: Viewport | None = None) -> list[list[str]]:
+        """Builds the full visibility frame, inside ``viewport`` like :meth:`compose`.
+
+        Rows without the start, the end or the player are shared between
+        frames and must not be changed."""
+        viewport = self._viewport(viewport)
+        self._origin = (viewport.x, viewport.y)
+        rows, _ = self._base_frame(viewport)
+        display_maze = rows.copy()
+
+        for point in (self.maze.start, self.maze.end, self.cell.coord):
+            if point:
+                _, y = point.actual()
+                y -= viewport.y
+                if 0 <= y < len(rows) and display_maze[y] is rows[y]:
+                    display_maze[y] = rows[y].copy()
+
+        self.draw_static(display_maze)
+        return display_maze
+
+    def frame_lines(self, display_maze: list[list[str]]) -> list[str]:
+        """Joins the rows of a frame, reusing the cached lines of unchanged full visibility rows."""
+        if self._base is None:
+            return ["".join(row) for row in display_maze]
+
+        rows, lines = self._base[3], self._base[4]
+        if len(rows) != len(display_maze):
+            return ["".join(row) for row in display_maze]
+        return [line if row is base else "".join(row) for row, base, line in zip(display_maze, rows, lines)]
+
+    @staticmethod
+    def print_frame(
+        display_maze: list[list[str]],
+        lpadding: str = "",
+        console_clear_sequence: str = "",
+        *,
+        lines: list[str] | None = None,
+    ):
         if console_clear_sequence:
             print(console_clear_sequence)
 
-        print(lpadding + f"\n{lpadding}".join("".join(x for x in row) for row in display_maze))
-
-    def full_render(self, lpadding: str = "", console_clear_sequence: str = ""):
-        display_maze = [[self.theme.get(c.type) for c in row] for row in self.maze.grid]
-
-        # Render static elements
-        x, y = self.maze.start.actual()
-        display_maze[y][x] = self.theme.start
+        if lines is None:
+            lines = ["".join(row) for row in display_maze]
+        print(lpadding + f"\n{lpadding}".join(lines))
 
-        x, y = self.maze.end.actual()
-        display_maze[y][x] = self.theme.end
+    def render(self, lpadding: str = "", console_clear_sequence: str = "", viewport: Viewport | None = None):
+        self.print_frame(self.compose(viewport), lpadding, console_clear_sequence)
 
-        x, y = self.cell.coord.actual()
-        display_maze[y][x] = self.theme.player
+    def full_render(self, lpadding: str = "", console_clear_sequence: str = "", viewport: Viewport | None = None):
+        display_maze = self.compose_full(viewport)
+        self.print_frame(display_maze, lpadding, console_clear_sequence, lines=self.frame_lines(display_maze))
 
-        # Print everything.
-        if console_clear_sequence:
-            print(console_clear_sequence)
-
-        print(lpadding + f"\n{lpadding}".join("".join(x for x in row) for row in display_maze))
-
-    def move(self, direction: CardinalDirection | str):
-        """Moves the player in one cardinal direction.
+    def move(self, direction: CardinalDirection | str) -> bool:
+        """Moves the player in one cardinal direction. Returns whether it counted as a move.
 
         direction: CardinalDirection
             The direction to move towards. non-cardinal directions will be ignored.
         """
         if direction not in CARDINAL_DIRECTIONS:
-            return
+            return False
 
         if self.snap:
             next = self.cell.paths[direction]
 
         else:
             if self.cell.hallways[direction]:
-                _, getter = intersections[direction]
-                next = getter(self.cell.coord).get(self.maze)
+                x, y = self.cell.coord.actual()
+                dx, dy = OFFSETS[direction]
+                next = self.maze.cell_at(x + dx, y + dy)
             else:
                 next = None
 
         if next:
-            self.moves.append(self.cell)
+            moves = self.moves
+            if len(moves) == moves.maxlen and len(self.trail):
+                # The oldest move is about to be dropped, and its segment with it.
+                self.trail.remove_oldest()
+            moves.append(self.cell)
+            if len(moves) > 1:
+                self.trail.add(moves[-2], moves[-1])
             self.cell = next
+
+            if isinstance(self.maze, World):
+                self.maze.visit(next.coord)
+            return True
+
+        return False
@@ -0,0 +1,152 @@
+"""Opt-in instrumentation of maze generation and of every frame of the game.
+
+Instrumented code reports timings with :func:`section` and amounts with
+:func:`count`. Both go to every hook added with :func:`add_hook`, and do
+nothing when there are none. :class:`Profiler` is a hook that keeps every
+measurement and builds a JSON report::
+
+    profiler = Profiler()
+    add_hook(profiler)
+    maze.generate()
+    remove_hook(profiler)
+    profiler.dump(sys.stdout)
+
+Timings of :meth:`Maze.generate` are ``generate.allocate``, ``generate.carve``
+and ``generate.fill_paths``, with the ``cells`` and ``objects`` (allocated
+memory blocks) counts. The game reports ``frame.input`` for every batch of
+keys read, ``frame.move`` for every move and ``frame.render`` for every
+frame, with the ``keys`` and ``frames`` counts.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import sys
+import time
+from typing import Any, ContextManager, Iterator
+
+__all__ = ("Hook", "Profiler", "add_hook", "remove_hook", "enabled", "section", "count", "allocated")
+
+# Upper bounds, in milliseconds, of the histogram buckets of every timing.
+BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 1000.0)
+
+
+class Hook:
+    """Receives the measurements. Override the methods needed."""
+
+    def timing(self, name: str, seconds: float):
+        pass
+
+    def count(self, name: str, amount: int):
+        pass
+
+
+_hooks: list[Hook] = []
+_DISABLED = contextlib.nullcontext()
+
+
+def add_hook(hook: Hook):
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Hook):
+    _hooks.remove(hook)
+
+
+def enabled() -> bool:
+    """Whether any hook is listening. Measurements that cost something to take should check it first."""
+    return bool(_hooks)
+
+
+@contextlib.contextmanager
+def _timed(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        for hook in _hooks:
+            hook.timing(name, seconds)
+
+
+def section(name: str) -> ContextManager[None]:
+    """Times the body of a ``with`` block as ``name``."""
+    if not _hooks:
+        return _DISABLED
+    return _timed(name)
+
+
+def count(name: str, amount: int = 1):
+    """Reports ``amount`` more of ``name``."""
+    for hook in _hooks:
+        hook.count(name, amount)
+
+
+@contextlib.contextmanager
+def allocated(name: str = "objects") -> Iterator[None]:
+    """Counts the memory blocks still allocated after the body of a ``with`` block as ``name``."""
+    if not _hooks:
+        yield
+        return
+
+    before = sys.getallocatedblocks()
+    try:
+        yield
+    finally:
+        count(name, sys.getallocatedblocks() - before)
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Profiler(Hook):
+    """Keeps every measurement. See :meth:`report`."""
+
+    def __init__(self):
+        self.timings: dict[str, list[float]] = {}
+        self.counts: dict[str, int] = {}
+
+    def timing(self, name: str, seconds: float):
+        self.timings.setdefault(name, []).append(seconds)
+
+    def count(self, name: str, amount: int):
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def summary(self, name: str) -> dict[str, Any]:
+        """The statistics of a timing, in milliseconds, with a histogram of the samples."""
+        samples = sorted(seconds * 1000 for seconds in self.timings[name])
+        histogram = dict.fromkeys([f"<={bound:g}ms" for bound in BUCKETS] + [f">{BUCKETS[-1]:g}ms"], 0)
+        labels = list(histogram)
+        bucket = 0
+        for sample in samples:
+            while bucket < len(BUCKETS) and sample > BUCKETS[bucket]:
+                bucket += 1
+            histogram[labels[bucket]] += 1
+
+        return {
+            "count": len(samples),
+            "total": sum(samples),
+            "mean": sum(samples) / len(samples),
+            "min": samples[0],
+            "max": samples[-1],
+            "p50": _percentile(samples, 0.5),
+            "p95": _percentile(samples, 0.95),
+            "p99": _percentile(samples, 0.99),
+            "histogram": histogram,
+        }
+
+    def report(self) -> dict[str, Any]:
+        import platform
+
+        return {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timings": {name: self.summary(name) for name in self.timings},
+            "counts": dict(self.counts),
+        }
+
+    def dump(self, fp: Any):
+        import json
+
+        json.dump(self.report(), fp, indent=2)
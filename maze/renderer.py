@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from typing import Callable
+
+__all__ = ("FrameRenderer",)
+
+
+def _ansi_move(x: int, y: int) -> str:
+    return f"\x1b[{y + 1};{x + 1}H"
+
+
+class FrameRenderer:
+    """Turns frames into terminal output, writing only the cells that
+    changed since the previous frame.
+
+    Frames are the ``list[list[str]]`` built by :meth:`Player.compose` and
+    :meth:`Player.compose_full`. Every cell of a frame must take
+    ``cell_width`` columns on screen.
+
+    origin: tuple[int, int]
+        The column and row, zero-based, where the frame starts on screen.
+    cell_width: int
+        The amount of columns taken by every cell.
+    move: Callable[[int, int], str] | None
+        Returns the sequence that moves the cursor to a zero-based column
+        and row. Defaults to the ANSI escape sequence, pass
+        ``Terminal.move_xy`` to use the one of a blessed terminal.
+    """
+
+    def __init__(
+        self,
+        origin: tuple[int, int] = (0, 0),
+        cell_width: int = 2,
+        move: Callable[[int, int], str] | None = None,
+    ):
+        self.origin = origin
+        self.cell_width = cell_width
+        self.move = move or _ansi_move
+        self.previous: list[list[str]] | None = None
+
+    def reset(self):
+        """Forgets the previous frame, so the next one is written in full."""
+        self.previous = None
+
+    def render(self, frame: list[list[str]]) -> str:
+        """Returns the output that turns the previous frame into ``frame``."""
+        origin_x, origin_y = self.origin
+        previous = self.previous
+        self.previous = frame
+
+        if previous is None or len(previous) != len(frame):
+            return "".join(self.move(origin_x, origin_y + y) + "".join(row) for y, row in enumerate(frame))
+
+        output: list[str] = []
+        for y, (old_row, row) in enumerate(zip(previous, frame)):
+            # Full visibility frames share the rows that did not change.
+            if old_row is row or old_row == row:
+                continue
+
+            if len(old_row) != len(row):
+                output.append(self.move(origin_x, origin_y + y) + "".join(row))
+                continue
+
+            # Consecutive changed cells are written after a single cursor move.
+            cursor = -1
+            for x, (old, new) in enumerate(zip(old_row, row)):
+                if old == new:
+                    continue
+                if x != cursor:
+                    output.append(self.move(origin_x + x * self.cell_width, origin_y + y))
+                output.append(new)
+                cursor = x + 1
+
+        return "".join(output)
@@ -0,0 +1,263 @@
+"""Headless simulation of agents moving through a maze.
+
+:class:`Simulation` moves agents the same way :meth:`Player.move` does, in
+snap and non-snap mode, but through tables of cell indices built once per
+maze, so no cells are created and nothing is drawn. :func:`play` drives a
+real :class:`Player` instead. :func:`sweep` runs simulations of many mazes
+in a process pool.
+
+Agents follow either a script, any iterable of directions, or a
+:data:`Policy` that picks the next direction from the current position.
+"""
+
+from __future__ import annotations
+
+from itertools import islice
+from multiprocessing import Pool
+import random
+from typing import Callable, Iterable, Iterator, NamedTuple, Union
+
+from .algorithms import GenerationAlgorithm
+from .cell import CARDINAL_DIRECTIONS, HALLWAY_FLAGS, OFFSETS, OPPOSITES, CardinalDirection, CellType, intersections
+from .grid import HALLWAY_SHIFT, TYPE_MASK
+from .maze import Maze, Size
+from .player import Player
+
+__all__ = (
+    "AgentResult",
+    "Policy",
+    "RandomWalk",
+    "WallFollower",
+    "Simulation",
+    "play",
+    "SweepJob",
+    "SweepResult",
+    "sweep",
+)
+
+# Returns the next direction for an agent at the given actual coordinates, or ``None`` to stop.
+Policy = Callable[["Simulation", int, int], Union[CardinalDirection, None]]
+Moves = Union[Iterable[CardinalDirection], Policy]
+
+
+class AgentResult(NamedTuple):
+    """The outcome of one agent.
+
+    ``steps`` is the amount of directions the agent tried, and ``moves`` the
+    amount of them that were moves, like the length of :attr:`Player.moves`.
+    ``won_at`` is the step after which the agent reached the end."""
+
+    steps: int
+    moves: int
+    won: bool
+    won_at: int | None
+    position: tuple[int, int]
+
+
+class RandomWalk:
+    """A policy that picks a random open direction at every step."""
+
+    def __init__(self, seed: int | None = None):
+        self.rng = random.Random(seed)
+
+    def __call__(self, simulation: Simulation, x: int, y: int) -> CardinalDirection | None:
+        return self.rng.choice(simulation.open_directions(x, y) or CARDINAL_DIRECTIONS)
+
+
+# The direction to try first, then the next ones, relative to the current heading.
+_TURNS: dict[CardinalDirection, tuple[CardinalDirection, ...]] = {
+    direction: (intersections[direction][0][1], direction, intersections[direction][0][0], OPPOSITES[direction])
+    for direction in CARDINAL_DIRECTIONS
+}
+
+
+class WallFollower:
+    """A policy that keeps one hand on the wall. Solves every perfect maze.
+
+    Keeps the heading of the agent, so every agent needs its own instance."""
+
+    def __init__(self, hand: str = "right"):
+        if hand not in ("left", "right"):
+            raise ValueError("hand must be 'left' or 'right'.")
+        self.hand = hand
+        self.heading: CardinalDirection = "S"
+
+    def __call__(self, simulation: Simulation, x: int, y: int) -> CardinalDirection | None:
+        open = simulation.open_directions(x, y)
+        turns = _TURNS[self.heading]
+        if self.hand == "left":
+            turns = (turns[2], turns[1], turns[0], turns[3])
+
+        for direction in turns:
+            if direction in open:
+                self.heading = direction
+                return direction
+        return None
+
+
+def _packed_cells(maze: Maze) -> bytes:
+    """The type and hallway flags of every cell, see :mod:`maze.grid`."""
+    data = getattr(maze.grid, "data", None)
+    if data is not None:
+        return bytes(data)
+
+    packed = bytearray()
+    for row in maze.grid:
+        for cell in row:
+            flags = sum(flag for direction, flag in HALLWAY_FLAGS.items() if cell.hallways[direction])
+            packed.append(cell.type.value | flags << HALLWAY_SHIFT)
+    return bytes(packed)
+
+
+class Simulation:
+    """Moves agents through ``maze`` like :meth:`Player.move`, without a :class:`Player`.
+
+    Cells are numbered ``y * width + x`` in actual coordinates. For every
+    direction, one table holds the cell reached by a non-snap move and another
+    the cell reached by a snap move, ``-1`` when there is none."""
+
+    def __init__(self, maze: Maze):
+        if not maze.generated:
+            raise RuntimeError("Passed a non-generated map.")
+
+        self.maze = maze
+        width, height = self.width, self.height = maze._actual_size
+        cells = _packed_cells(maze)
+        count = width * height
+        end_x, end_y = maze.end.actual()
+        start_x, start_y = maze.start.actual()
+        self.start = start_y * width + start_x
+        self.end = end_y * width + end_x
+
+        self.steps: dict[CardinalDirection, list[int]] = {}
+        self.jumps: dict[CardinalDirection, list[int]] = {}
+
+        for direction in CARDINAL_DIRECTIONS:
+            dx, dy = OFFSETS[direction]
+            offset = dy * width + dx
+            flag = HALLWAY_FLAGS[direction] << HALLWAY_SHIFT
+            (left, right), _ = intersections[direction]
+            # A snap move stops on a cell with a side hallway, on the end, or before a wall.
+            stop_flags = (HALLWAY_FLAGS[left] | HALLWAY_FLAGS[right]) << HALLWAY_SHIFT
+
+            steps = [-1] * count
+            jumps = [-1] * count
+            # Cells further along the direction first, so their jumps are known.
+            order = range(count - 1, -1, -1) if offset > 0 else range(count)
+            for index in order:
+                cell = cells[index]
+                if cell & TYPE_MASK == CellType.wall.value:
+                    continue
+                if not cell & flag:
+                    # Snap moves towards a dead end stay, but still count as a move.
+                    jumps[index] = index
+                    continue
+
+                next = index + offset
+                steps[index] = next
+                next_cell = cells[next]
+                if next_cell & stop_flags or not next_cell & flag or next == self.end:
+                    jumps[index] = next
+                else:
+                    jumps[index] = jumps[next]
+
+            self.steps[direction] = steps
+            self.jumps[direction] = jumps
+
+    def open_directions(self, x: int, y: int) -> list[CardinalDirection]:
+        """The directions with a hallway from the cell at the given actual coordinates."""
+        index = y * self.width + x
+        return [direction for direction in CARDINAL_DIRECTIONS if self.steps[direction][index] != -1]
+
+    def run(self, moves: Moves, *, snap: bool = True, max_steps: int | None = None) -> AgentResult:
+        """Moves an agent from the start until it reaches the end, the moves run out or ``max_steps`` steps.
+
+        A policy must be given ``max_steps``, or stop by itself."""
+        tables = self.jumps if snap else self.steps
+        index, end = self.start, self.end
+        steps = taken = 0
+
+        if callable(moves):
+            policy, width = moves, self.width
+            while index != end and (max_steps is None or steps < max_steps):
+                direction = policy(self, index % width, index // width)
+                if direction is None:
+                    break
+                steps += 1
+                table = tables.get(direction)
+                if table is not None and (next := table[index]) != -1:
+                    index = next
+                    taken += 1
+        else:
+            if max_steps is not None:
+                moves = islice(moves, max_steps)
+            for direction in moves:
+                steps += 1
+                table = tables.get(direction)
+                if table is not None and (next := table[index]) != -1:
+                    index = next
+                    taken += 1
+                    if index == end:
+                        break
+
+        won = index == end
+        return AgentResult(steps, taken, won, steps if won else None, (index % self.width, index // self.width))
+
+    def run_many(self, agents: Iterable[Moves], *, snap: bool = True, max_steps: int | None = None) -> list[AgentResult]:
+        """Runs every agent, one after the other, from the start."""
+        return [self.run(moves, snap=snap, max_steps=max_steps) for moves in agents]
+
+
+def play(player: Player, moves: Iterable[CardinalDirection], *, max_steps: int | None = None) -> AgentResult:
+    """Moves a :class:`Player` with :meth:`Player.move` until it wins or the moves run out.
+
+    The same as :meth:`Simulation.run` with a script, from wherever the player is."""
+    steps = taken = 0
+    if max_steps is not None:
+        moves = islice(moves, max_steps)
+
+    won = player.won
+    for direction in moves:
+        if won:
+            break
+        steps += 1
+        # Not measured on ``player.moves``, which is capped by ``look_behind``.
+        taken += player.move(direction)
+        won = player.won
+
+    x, y = player.cell.coord.actual()
+    return AgentResult(steps, taken, won, steps if won else None, (x, y))
+
+
+class SweepJob(NamedTuple):
+    """A maze to generate and the agents to run through it.
+
+    ``policies`` are called to create a policy for each agent, so that every
+    agent has its own state, and must be picklable, like a class."""
+
+    size: Size
+    seed: int
+    policies: tuple[Callable[[], Policy], ...]
+    snap: bool = True
+    max_steps: int = 10_000
+    algorithm: str | GenerationAlgorithm = "dfs"
+
+
+class SweepResult(NamedTuple):
+    job: SweepJob
+    results: list[AgentResult]
+
+
+def _run_job(job: SweepJob) -> SweepResult:
+    # Compact mazes skip filling the paths, the simulation builds its own tables.
+    maze = Maze(job.size, compact=True, seed=job.seed)
+    maze.generate(job.algorithm)
+    simulation = Simulation(maze)
+    agents = [policy() for policy in job.policies]
+    return SweepResult(job, simulation.run_many(agents, snap=job.snap, max_steps=job.max_steps))
+
+
+def sweep(jobs: Iterable[SweepJob], *, processes: int | None = None, chunksize: int = 1) -> Iterator[SweepResult]:
+    """Runs the jobs in a process pool, one per core by default, and yields their results in order."""
+    with Pool(processes) as pool:
+        yield from pool.imap(_run_job, jobs, chunksize=chunksize)
@@ -0,0 +1,271 @@
+"""Solvers that work on the junction graph formed by :attr:`Cell.paths`.
+
+The nodes of the graph are the junctions, corners and dead ends of a
+maze, and its edges are the straight corridors between them. Distances
+are measured in steps on the actual grid, so a corridor between two
+neighbouring tiles is two steps long.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+import heapq
+from typing import Callable, Iterator, TYPE_CHECKING
+import weakref
+
+from .cell import Cell, CARDINAL_DIRECTIONS
+from .grid import CompactGrid
+
+if TYPE_CHECKING:
+    from .maze import Maze
+    from .world import World
+
+__all__ = ("neighbours", "bfs", "astar", "dead_end_fill", "DistanceField", "distance_field")
+
+Key = tuple[int, int]
+
+
+def _distance(a: Cell, b: Cell) -> int:
+    (a_x, a_y), (b_x, b_y) = a.coord.actual(), b.coord.actual()
+    return abs(a_x - b_x) + abs(a_y - b_y)
+
+
+def _between(cell: Cell, a: Cell, b: Cell) -> bool:
+    """Whether ``cell`` lies on the straight corridor from ``a`` to ``b``."""
+    x, y = cell.coord.actual()
+    (a_x, a_y), (b_x, b_y) = a.coord.actual(), b.coord.actual()
+    return min(a_x, b_x) <= x <= max(a_x, b_x) and min(a_y, b_y) <= y <= max(a_y, b_y)
+
+
+def neighbours(cell: Cell) -> Iterator[tuple[Cell, int]]:
+    """Yields the nodes of the junction graph next to ``cell``, with their distance."""
+    for direction in CARDINAL_DIRECTIONS:
+        next = cell.paths[direction]
+        if next is not None and next != cell:
+            yield next, _distance(cell, next)
+
+
+def _endpoints(maze: Maze | World, start: Cell | None, goal: Cell | None) -> tuple[Cell, Cell]:
+    start = start or maze.start.get(maze)
+    if goal is None and maze.end is not None:
+        goal = maze.end.get(maze)
+    if not start or not goal:
+        raise ValueError("The maze must be generated, and have a goal.")
+    return start, goal
+
+
+def _route(parents: dict[Key, Cell | None], cell: Cell) -> list[Cell]:
+    route = [cell]
+    while (parent := parents[route[-1].coord.actual()]) is not None:
+        route.append(parent)
+    route.reverse()
+    return route
+
+
+def bfs(maze: Maze | World, start: Cell | None = None, goal: Cell | None = None) -> list[Cell] | None:
+    """Finds the route that crosses the fewest junctions.
+
+    ``start`` and ``goal`` default to the start and end of the maze. Returns
+    the nodes of the route, both ends included, or ``None`` when the goal
+    cannot be reached. In a perfect maze this is also the shortest route."""
+    start, goal = _endpoints(maze, start, goal)
+    if start == goal:
+        return [start]
+
+    parents: dict[Key, Cell | None] = {start.coord.actual(): None}
+    queue: deque[Cell] = deque([start])
+
+    while queue:
+        current = queue.popleft()
+        for next, _ in neighbours(current):
+            if _between(goal, current, next):
+                parents[goal.coord.actual()] = current
+                return _route(parents, goal)
+
+            key = next.coord.actual()
+            if key not in parents:
+                parents[key] = current
+                queue.append(next)
+
+    return None
+
+
+def astar(maze: Maze | World, start: Cell | None = None, goal: Cell | None = None) -> list[Cell] | None:
+    """Finds the shortest route with A*, using the Manhattan distance as the heuristic.
+
+    Takes and returns the same as :func:`bfs`."""
+    start, goal = _endpoints(maze, start, goal)
+
+    parents: dict[Key, Cell | None] = {start.coord.actual(): None}
+    costs: dict[Key, int] = {start.coord.actual(): 0}
+    # The counter breaks ties, so cells are never compared.
+    counter = 0
+    heap: list[tuple[int, int, Cell]] = [(_distance(start, goal), counter, start)]
+
+    while heap:
+        _, _, current = heapq.heappop(heap)
+        if current == goal:
+            return _route(parents, goal)
+
+        cost = costs[current.coord.actual()]
+        for next, distance in neighbours(current):
+            if _between(goal, current, next):
+                next, distance = goal, _distance(current, goal)
+
+            key = next.coord.actual()
+            if key not in costs or cost + distance < costs[key]:
+                costs[key] = cost + distance
+                parents[key] = current
+                counter += 1
+                heapq.heappush(heap, (cost + distance + _distance(next, goal), counter, next))
+
+    return None
+
+
+def dead_end_fill(maze: Maze, start: Cell | None = None, goal: Cell | None = None) -> list[Cell]:
+    """Repeatedly fills the dead ends of the junction graph.
+
+    Returns the nodes that were left, which are the nodes of every route
+    between ``start`` and ``goal``. In a perfect maze that is the solution."""
+    start, goal = _endpoints(maze, start, goal)
+    keep = {start.coord.actual(), goal.coord.actual()}
+
+    cells: dict[Key, Cell] = {start.coord.actual(): start}
+    edges: dict[Key, set[Key]] = {}
+    queue: deque[Cell] = deque([start])
+
+    # Collect the graph.
+    while queue:
+        current = queue.popleft()
+        key = current.coord.actual()
+        edges[key] = set()
+        for next, _ in neighbours(current):
+            if _between(goal, current, next) and key != goal.coord.actual():
+                next = goal
+            next_key = next.coord.actual()
+            edges[key].add(next_key)
+            if next_key not in cells:
+                cells[next_key] = next
+                queue.append(next)
+
+    # Make the graph undirected, the start and goal may be in the middle of a corridor.
+    for key, targets in list(edges.items()):
+        for target in targets:
+            edges[target].add(key)
+
+    # An end in the middle of a corridor splits it, so the corridor must not join its sides as well.
+    for special in keep:
+        targets = edges.get(special, set())
+        for a in targets:
+            for b in targets:
+                if a != b and b in edges[a] and _between(cells[special], cells[a], cells[b]):
+                    edges[a].discard(b)
+                    edges[b].discard(a)
+
+    filling = deque(key for key, targets in edges.items() if len(targets) <= 1 and key not in keep)
+    while filling:
+        key = filling.popleft()
+        for target in edges.pop(key, ()):
+            targets = edges.get(target)
+            if targets is not None:
+                targets.discard(key)
+                if len(targets) <= 1 and target not in keep:
+                    filling.append(target)
+
+    return [cells[key] for key in edges]
+
+
+class DistanceField:
+    """The distance from every node of the junction graph to the end of a maze.
+
+    Computed once with Dijkstra's algorithm, so that distances and the
+    remaining route can be queried on every frame."""
+
+    def __init__(self, maze: Maze):
+        end = maze.end.get(maze)
+        if not end:
+            raise ValueError("Passed a non-generated map.")
+
+        # Neither the maze nor its cells are kept, or the field would keep the maze alive in ``_FIELDS``:
+        # compact grids and their cells point back to the maze.
+        self._maze = weakref.ref(maze)
+        grid = maze.grid
+        self._grid: Callable[[], object] = weakref.ref(grid) if isinstance(grid, CompactGrid) else lambda: grid
+        self.distances: dict[Key, int] = {end.coord.actual(): 0}
+        # The next node towards the end, for every node.
+        self.successors: dict[Key, Key] = {}
+
+        counter = 0
+        heap: list[tuple[int, int, Cell]] = [(0, counter, end)]
+        while heap:
+            cost, _, current = heapq.heappop(heap)
+            if cost > self.distances[current.coord.actual()]:
+                continue
+            for next, distance in neighbours(current):
+                key = next.coord.actual()
+                if key not in self.distances or cost + distance < self.distances[key]:
+                    self.distances[key] = cost + distance
+                    self.successors[key] = current.coord.actual()
+                    counter += 1
+                    heapq.heappush(heap, (cost + distance, counter, next))
+
+    def is_current(self, maze: Maze) -> bool:
+        """Whether the field was computed for the current grid of ``maze``, and not before it was generated again."""
+        return self._maze() is maze and self._grid() is maze.grid
+
+    def _closest(self, cell: Cell) -> tuple[Cell | None, int | None]:
+        """The node next to ``cell`` that is the closest to the end, and the distance through it."""
+        best: tuple[Cell | None, int | None] = (None, None)
+        for next, distance in neighbours(cell):
+            if (remaining := self.distances.get(next.coord.actual())) is not None:
+                if best[1] is None or remaining + distance < best[1]:
+                    best = (next, remaining + distance)
+        return best
+
+    def distance(self, cell: Cell) -> int | None:
+        """The distance from ``cell`` to the end, or ``None`` if the end cannot be reached."""
+        try:
+            return self.distances[cell.coord.actual()]
+        except KeyError:
+            pass
+
+        # Cells in the middle of a corridor are not nodes.
+        _, distance = self._closest(cell)
+        return distance
+
+    def reachable(self, cell: Cell) -> bool:
+        """Whether the end can be reached from ``cell``."""
+        return self.distance(cell) is not None
+
+    def route(self, cell: Cell) -> list[Cell]:
+        """The nodes of the shortest route from ``cell`` to the end, both included.
+
+        Empty if the end cannot be reached."""
+        route = [cell]
+        if cell.coord.actual() not in self.distances:
+            next, _ = self._closest(cell)
+            if next is None:
+                return []
+            route.append(next)
+
+        maze = self._maze()
+        if maze is None:
+            raise RuntimeError("The maze of the distance field no longer exists.")
+        while (key := self.successors.get(route[-1].coord.actual())) is not None:
+            next = maze.cell_at(*key)
+            assert next is not None
+            route.append(next)
+        return route
+
+
+_FIELDS: weakref.WeakKeyDictionary[Maze, DistanceField] = weakref.WeakKeyDictionary()
+
+
+def distance_field(maze: Maze) -> DistanceField:
+    """Returns the :class:`DistanceField` of ``maze``, computing it only the first time.
+
+    The field is computed again if the maze was generated again."""
+    field = _FIELDS.get(maze)
+    if field is None or not field.is_current(maze):
+        field = _FIELDS[maze] = DistanceField(maze)
+    return field
@@ -0,0 +1,203 @@
+"""Compact binary format for storing mazes.
+
+A file starts with :data:`MAGIC` and is followed by any amount of records.
+Every record is a :data:`RECORD_HEADER` and then the hallway flags of the
+maze, 4 bits per tile, row by row. Even tiles use the low half of a byte
+and odd tiles the high half.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from typing import BinaryIO, Iterator, NamedTuple, Sequence
+
+from .cell import Cell, CellType, Point, CardinalDirection, HALLWAY_FLAGS
+from .grid import CellView, CompactGrid, HALLWAY_SHIFT
+from .maze import Maze, Size
+from .viewport import Viewport
+
+__all__ = (
+    "MazeRecord",
+    "PackedGrid",
+    "pack_flags",
+    "unpack_flags",
+    "write_header",
+    "write_record",
+    "read_records",
+    "open_packed",
+)
+
+MAGIC = b"MAZE\x01\x00\x00\x00"
+
+# width, height, start x, start y, end x, end y, has seed, seed. Points are logical.
+RECORD_HEADER = struct.Struct("<6I?q")
+# The seeds that fit in a record.
+SEED_RANGE = range(-(2**63), 2**63)
+
+
+def pack_flags(flags: Sequence[int]) -> bytes:
+    """Packs hallway flags two per byte."""
+    packed = bytearray(a | b << 4 for a, b in zip(flags[::2], flags[1::2]))
+    if len(flags) % 2:
+        packed.append(flags[-1])
+    return bytes(packed)
+
+
+def unpack_flags(packed: bytes | memoryview, count: int) -> bytearray:
+    """Unpacks ``count`` hallway flags packed with :func:`pack_flags`."""
+    flags = bytearray(count + count % 2)
+    flags[::2] = bytes(byte & 0xF for byte in packed)
+    flags[1::2] = bytes(byte >> 4 for byte in packed)
+    del flags[count:]
+    return flags
+
+
+class MazeRecord(NamedTuple):
+    size: Size
+    start: Point
+    end: Point
+    seed: int | None
+    packed: bytes
+
+    @classmethod
+    def from_maze(cls, maze: Maze) -> MazeRecord:
+        return cls(maze.size, maze.start, maze.end, maze.seed, pack_flags(maze.hallway_flags()))
+
+    def to_bytes(self) -> bytes:
+        if self.seed is not None and self.seed not in SEED_RANGE:
+            raise ValueError(f"Seed {self.seed} cannot be stored, seeds must fit in a signed 64-bit integer.")
+
+        (start_x, start_y), (end_x, end_y) = self.start.actual(), self.end.actual()
+        header = RECORD_HEADER.pack(
+            *self.size, start_x // 2, start_y // 2, end_x // 2, end_y // 2, self.seed is not None, self.seed or 0
+        )
+        return header + self.packed
+
+    def to_maze(self, *, compact: bool = False) -> Maze:
+        flags = unpack_flags(self.packed, self.size.width * self.size.height)
+        return Maze.from_hallway_flags(self.size, flags, start=self.start, end=self.end, compact=compact, seed=self.seed)
+
+
+def write_header(fp: BinaryIO):
+    fp.write(MAGIC)
+
+
+def write_record(fp: BinaryIO, maze: Maze | MazeRecord):
+    if isinstance(maze, Maze):
+        maze = MazeRecord.from_maze(maze)
+    fp.write(maze.to_bytes())
+
+
+def _parse_header(header: bytes) -> tuple[Size, Point, Point, int | None, int]:
+    width, height, start_x, start_y, end_x, end_y, has_seed, seed = RECORD_HEADER.unpack(header)
+    return (
+        Size(width, height),
+        Point(start_x, start_y),
+        Point(end_x, end_y),
+        seed if has_seed else None,
+        (width * height + 1) // 2,
+    )
+
+
+def read_records(fp: BinaryIO) -> Iterator[MazeRecord]:
+    """Reads the records of a file written with :func:`write_header` and :func:`write_record`."""
+    if fp.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a maze file.")
+
+    while header := fp.read(RECORD_HEADER.size):
+        if len(header) != RECORD_HEADER.size:
+            raise ValueError("Truncated maze file.")
+
+        size, start, end, seed, length = _parse_header(header)
+        packed = fp.read(length)
+        if len(packed) != length:
+            raise ValueError("Truncated maze file.")
+
+        yield MazeRecord(size, start, end, seed, packed)
+
+
+_EAST_WEST = CellType.tile.value | (HALLWAY_FLAGS["E"] | HALLWAY_FLAGS["W"]) << HALLWAY_SHIFT
+_NORTH_SOUTH = CellType.tile.value | (HALLWAY_FLAGS["N"] | HALLWAY_FLAGS["S"]) << HALLWAY_SHIFT
+
+
+class PackedGrid(CompactGrid):
+    """A read-only grid decoded on demand from packed hallway flags.
+
+    ``packed`` is usually a memory map of a maze file, so only the pages
+    holding the cells that are accessed are ever read from disk. Changes
+    made to the cells are not kept.
+    """
+
+    __slots__ = ("packed", "offset", "start", "end")
+
+    def __init__(self, source: Maze, packed: bytes | mmap.mmap, offset: int):
+        self.source = source
+        self.width = source._actual_size.width
+        self.height = source._actual_size.height
+        self.packed = packed
+        self.offset = offset
+        self.start = source.start.actual()
+        self.end = source.end.actual()
+
+    def _flags(self, x: int, y: int) -> int:
+        """The hallway flags of the tile at the given logical coordinates."""
+        index = y * self.source.size.width + x
+        byte = self.packed[self.offset + index // 2]
+        return byte >> 4 if index % 2 else byte & 0xF
+
+    def cell(self, x: int, y: int) -> Cell:
+        if x % 2 and y % 2:
+            value = CellType.wall.value
+        elif x % 2:
+            value = _EAST_WEST if self._flags(x // 2, y // 2) & HALLWAY_FLAGS["E"] else CellType.wall.value
+        elif y % 2:
+            value = _NORTH_SOUTH if self._flags(x // 2, y // 2) & HALLWAY_FLAGS["S"] else CellType.wall.value
+        else:
+            flags = self._flags(x // 2, y // 2)
+            if (x, y) == self.end:
+                type = CellType.end
+            elif (x, y) == self.start:
+                type = CellType.start
+            else:
+                type = CellType.tile if flags else CellType.wall
+            value = type.value | flags << HALLWAY_SHIFT
+
+        return CellView(self.source, bytearray([value]), 0, Point(x, y, is_actual=True))
+
+    def carve(self, x: int, y: int, direction: CardinalDirection):
+        raise RuntimeError("Loaded mazes are read-only.")
+
+    def type_codes(self, viewport: Viewport | None = None) -> list[bytes]:
+        x, y, width, height = viewport or (0, 0, self.width, self.height)
+        return [bytes(self.cell(column, row).type.value for column in range(x, x + width)) for row in range(y, y + height)]
+
+    def hallway_flags(self) -> bytearray:
+        width, height = self.source.size
+        length = (width * height + 1) // 2
+        return unpack_flags(self.packed[self.offset : self.offset + length], width * height)
+
+
+def open_packed(cls: type[Maze], path: str | os.PathLike[str]) -> Maze:
+    """Memory-maps the first maze of a file. See :meth:`Maze.load`."""
+    with open(path, "rb") as fp:
+        if fp.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a maze file.")
+
+        header = fp.read(RECORD_HEADER.size)
+        if len(header) != RECORD_HEADER.size:
+            raise ValueError("Truncated maze file.")
+
+        size, start, end, seed, length = _parse_header(header)
+        offset = len(MAGIC) + RECORD_HEADER.size
+        if os.fstat(fp.fileno()).st_size < offset + length:
+            raise ValueError("Truncated maze file.")
+
+        # The map stays valid after the file is closed.
+        packed = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+    maze = cls(size, compact=True, seed=seed)
+    maze.start, maze.end = start, end
+    maze.grid = PackedGrid(maze, packed, offset)
+    return maze
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import NamedTuple, TYPE_CHECKING
 
+from .cell import CellType
+
 if TYPE_CHECKING:
-    from .cell import CellType, CardinalDirection
+    from .cell import CardinalDirection
 
 __all__ = ("Theme", "DEFAULT_THEME")
 
@@ -21,15 +24,28 @@ class Theme(NamedTuple):
     trail: str
 
     def get(self, type: CellType):
-        return getattr(self, type.name, "")
+        return self[_TYPE_FIELDS[type]]
 
     def direction(self, direction: CardinalDirection):
-        return {
-            "N": self.up,
-            "S": self.down,
-            "E": self.right,
-            "W": self.left,
-        }[direction]
+        return self[_DIRECTION_FIELDS[direction]]
+
+    def compile(self) -> tuple[str, ...]:
+        """The string of every :class:`CellType`, indexed by its value. Compiled once per theme."""
+        return _compile(self)
+
+
+_TYPE_FIELDS = {type: Theme._fields.index(type.name) for type in CellType}
+_DIRECTION_FIELDS = {
+    "N": Theme._fields.index("up"),
+    "S": Theme._fields.index("down"),
+    "E": Theme._fields.index("right"),
+    "W": Theme._fields.index("left"),
+}
+
+
+@lru_cache(maxsize=16)
+def _compile(theme: Theme) -> tuple[str, ...]:
+    return tuple(theme.get(type) for type in CellType)
 
 
 DEFAULT_THEME = Theme(
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import TYPE_CHECKING, Iterable
+
+from .cell import CARDINAL_DIRECTIONS, OFFSETS, CardinalDirection
+
+if TYPE_CHECKING:
+    from .cell import Cell
+    from .theme import Theme
+
+__all__ = ("Trail",)
+
+
+class Trail:
+    """The segments between the past positions of a player, and the arrows
+    towards the directions that could be taken from them.
+
+    Kept up to date one segment at a time, so drawing it does not depend on
+    how many moves were made. Every cell only keeps what was drawn on it
+    last: whatever was drawn before is older, so it is removed before it
+    could show again.
+    """
+
+    def __init__(self):
+        # Row, then column, to the number of the segment that drew there last,
+        # and the direction of the arrow, or ``None`` for the trail.
+        self.rows: dict[int, dict[int, tuple[int, CardinalDirection | None]]] = {}
+        # The number of every segment, oldest first, and the cells it drew on.
+        self.segments: deque[tuple[int, list[tuple[int, int]]]] = deque()
+        self._count = 0
+
+    def __len__(self):
+        return len(self.segments)
+
+    def _set(self, number: int, x: int, y: int, direction: CardinalDirection | None, cells: list[tuple[int, int]]):
+        self.rows.setdefault(y, {})[x] = (number, direction)
+        cells.append((x, y))
+
+    def add(self, previous: Cell, current: Cell):
+        """Adds the segment from ``previous`` to ``current``, drawn after every other one."""
+        number = self._count
+        self._count += 1
+        cells: list[tuple[int, int]] = []
+
+        x, y = current.coord.actual()
+        for direction in CARDINAL_DIRECTIONS:
+            if current.paths[direction] is not None and current.hallways[direction]:
+                dx, dy = OFFSETS[direction]
+                self._set(number, (x * 2 + dx) // 2, (y * 2 + dy) // 2, direction, cells)
+
+        x_1, y_1 = previous.coord.actual()
+        x_2, y_2 = x, y
+        for x in range(min(x_1, x_2), max(x_1, x_2) + 1):
+            for y in range(min(y_1, y_2), max(y_1, y_2) + 1):
+                self._set(number, x, y, None, cells)
+
+        self.segments.append((number, cells))
+
+    def remove_oldest(self):
+        """Removes the oldest segment, revealing what is under it."""
+        number, cells = self.segments.popleft()
+        for x, y in cells:
+            row = self.rows.get(y)
+            if row is not None and (drawn := row.get(x)) is not None and drawn[0] == number:
+                del row[x]
+                if not row:
+                    del self.rows[y]
+
+    def clear(self):
+        self.rows.clear()
+        self.segments.clear()
+
+    def rebuild(self, moves: Iterable[Cell]):
+        """Replaces the trail with the segments between ``moves``."""
+        self.clear()
+        previous = None
+        for cell in moves:
+            if previous is not None:
+                self.add(previous, cell)
+            previous = cell
+
+    def draw(self, display_maze: list[list[str]], origin: tuple[int, int], theme: Theme):
+        """Draws the trail on a frame whose top left cell is at ``origin``."""
+        left, top = origin
+        if not display_maze:
+            return
+        width = len(display_maze[0])
+
+        for y in range(top, top + len(display_maze)):
+            if (row := self.rows.get(y)) is None:
+                continue
+            frame_row = display_maze[y - top]
+            for x, (_, direction) in row.items():
+                if left <= x < left + width:
+                    frame_row[x - left] = theme.trail if direction is None else theme.direction(direction)
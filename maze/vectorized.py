@@ -0,0 +1,141 @@
+"""Maze generation with NumPy array operations instead of one Python step per tile.
+
+Only algorithms that decide every row independently can be vectorized this
+way: binary tree and sidewinder. Their hallways are drawn as a whole array
+of :data:`HALLWAY_FLAGS` at once, then written to the grid. Compact grids
+are filled with a few array assignments, so huge mazes generate in a
+fraction of a second.
+
+NumPy is optional. It is only imported by this module, which raises
+:class:`RuntimeError` when it is used without it installed.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from .cell import CellType, HALLWAY_FLAGS
+from .grid import CompactGrid, HALLWAY_SHIFT
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if TYPE_CHECKING:
+    from .maze import Maze
+
+__all__ = ("binary_tree_flags", "sidewinder_flags", "binary_tree", "sidewinder")
+
+_NORTH, _SOUTH, _EAST, _WEST = (HALLWAY_FLAGS[direction] for direction in ("N", "S", "E", "W"))
+
+
+def _numpy():
+    if np is None:
+        raise RuntimeError("Vectorized generation requires NumPy. Install it with 'pip install numpy'.")
+    return np
+
+
+def _random_bits(rng: Any, height: int, width: int) -> Any:
+    return rng.integers(0, 2, size=(height, width), dtype=bool)
+
+
+def _join_east(np: Any, flags: Any, east: Any):
+    """Opens the hallways from the tiles where ``east`` is set to the tile on their right.
+
+    ``np`` is the module returned by :func:`_numpy`."""
+    joined = east[:, :-1].view(np.uint8)
+    flags[:, :-1] |= joined * np.uint8(_EAST)
+    flags[:, 1:] |= joined * np.uint8(_WEST)
+
+
+def binary_tree_flags(width: int, height: int, seed: int | None = None) -> Any:
+    """The hallway flags of a binary tree maze, as a ``(height, width)`` array.
+
+    Every tile opens a hallway either north or east, picked at random. The
+    first row can only go east and the last column can only go north."""
+    np = _numpy()
+    rng = np.random.default_rng(seed)
+    flags = np.zeros((height, width), dtype=np.uint8)
+
+    east = _random_bits(rng, height, width)
+    east[0, :] = True
+    east[:, -1] = False
+    _join_east(np, flags, east)
+
+    north = (~east[1:]).view(np.uint8)
+    flags[1:] |= north * np.uint8(_NORTH)
+    flags[:-1] |= north * np.uint8(_SOUTH)
+    return flags
+
+
+def sidewinder_flags(width: int, height: int, seed: int | None = None) -> Any:
+    """The hallway flags of a sidewinder maze, as a ``(height, width)`` array.
+
+    Same as :func:`maze.algorithms.sidewinder`: the first row is a single
+    corridor, every other row is split into runs of tiles joined eastwards,
+    and each run is joined north from one of its tiles picked at random."""
+    np = _numpy()
+    rng = np.random.default_rng(seed)
+    flags = np.zeros((height, width), dtype=np.uint8)
+
+    east = _random_bits(rng, height, width)
+    east[0, :] = True
+    east[:, -1] = False
+    _join_east(np, flags, east)
+
+    if height > 1:
+        # Tiles are numbered by their index in the rows below the first one.
+        rows = east[1:]
+        indices = np.arange(rows.size, dtype=np.intp).reshape(rows.shape)
+        # A run starts at the first column and after every tile that does not go east.
+        starts = np.ones_like(rows)
+        starts[:, 1:] = ~rows[:, :-1]
+        run_starts = np.maximum.accumulate(starts * indices, axis=1).ravel()
+
+        # A run ends on every tile that does not go east, and is joined north from one of its tiles.
+        ends = np.flatnonzero(~rows)
+        first = run_starts[ends]
+        chosen = first + (rng.random(len(ends)) * (ends - first + 1)).astype(np.intp)
+
+        cells = flags.ravel()
+        cells[chosen + width] |= _NORTH
+        cells[chosen] |= _SOUTH
+
+    return flags
+
+
+def _fill_compact(grid: CompactGrid, flags: Any):
+    """Writes the tiles and corridors of the ``flags`` array to the cells of ``grid``."""
+    np = _numpy()
+    wall, tile = np.uint8(CellType.wall.value), np.uint8(CellType.tile.value)
+    cells = np.frombuffer(grid.data, dtype=np.uint8).reshape(grid.height, grid.width)
+    cells[::2, ::2] = tile | flags << HALLWAY_SHIFT
+    east = np.uint8(tile | (_EAST | _WEST) << HALLWAY_SHIFT)
+    south = np.uint8(tile | (_NORTH | _SOUTH) << HALLWAY_SHIFT)
+    cells[::2, 1::2] = np.where(flags[:, :-1] & _EAST, east, wall)
+    cells[1::2, ::2] = np.where(flags[:-1, :] & _SOUTH, south, wall)
+
+
+def _generate(maze: Maze, flags: Any):
+    if isinstance(maze.grid, CompactGrid):
+        _fill_compact(maze.grid, flags)
+        # The start was overwritten with the rest of the grid.
+        maze.start.set(maze, CellType.start)
+        return
+
+    np = _numpy()
+    for y, x in zip(*np.nonzero(flags & _EAST)):
+        maze.carve(int(x), int(y), "E")
+    for y, x in zip(*np.nonzero(flags & _SOUTH)):
+        maze.carve(int(x), int(y), "S")
+
+
+def binary_tree(maze: Maze):
+    """Binary tree algorithm, vectorized. See :func:`binary_tree_flags`."""
+    _generate(maze, binary_tree_flags(*maze.size, seed=maze.rng.getrandbits(64)))
+
+
+def sidewinder(maze: Maze):
+    """Sidewinder algorithm, vectorized. See :func:`sidewinder_flags`."""
+    _generate(maze, sidewinder_flags(*maze.size, seed=maze.rng.getrandbits(64)))
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from typing import NamedTuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .cell import Point
+    from .maze import Size
+
+__all__ = ("Viewport", "Camera")
+
+
+class Viewport(NamedTuple):
+    """A rectangle of the grid, in actual coordinates."""
+
+    x: int
+    y: int
+    width: int
+    height: int
+
+    def contains(self, x: int, y: int) -> bool:
+        return self.x <= x < self.x + self.width and self.y <= y < self.y + self.height
+
+
+def _follow(start: int, length: int, position: int, margin: int, bound: int | None) -> tuple[int, int]:
+    """Moves ``start`` along one axis so ``position`` is at least ``margin`` cells away from both edges."""
+    if bound is not None and length >= bound:
+        return 0, bound
+
+    margin = min(margin, (length - 1) // 2)
+    if position < start + margin:
+        start = position - margin
+    elif position > start + length - 1 - margin:
+        start = position - length + 1 + margin
+
+    if bound is not None:
+        start = max(0, min(start, bound - length))
+    return start, length
+
+
+class Camera:
+    """Keeps a viewport around a point, like the player.
+
+    The viewport only scrolls when the point gets within ``margin`` cells
+    of one of its edges, so most moves keep the same viewport.
+
+    width: int
+        The width of the viewport, in cells.
+    height: int
+        The height of the viewport, in cells.
+    bounds: Size | None
+        The actual size of the maze. The viewport never leaves it, and
+        shrinks to fit a maze smaller than it. ``None`` for an infinite world.
+    margin: int
+        How close to an edge, in cells, the point may get before scrolling.
+    """
+
+    def __init__(self, width: int, height: int, *, bounds: Size | None = None, margin: int = 6):
+        self.width = max(1, width)
+        self.height = max(1, height)
+        self.bounds = bounds
+        self.margin = margin
+        self.viewport: Viewport | None = None
+
+    def resize(self, width: int, height: int):
+        """Changes the size of the viewport. It is placed again on the next :meth:`follow`."""
+        self.width = max(1, width)
+        self.height = max(1, height)
+        self.viewport = None
+
+    def follow(self, point: Point) -> Viewport:
+        """Returns the viewport, scrolled to keep ``point`` in view."""
+        x, y = point.actual()
+        bound_x, bound_y = self.bounds if self.bounds else (None, None)
+
+        if self.viewport is None:
+            # Centered at first.
+            start_x, start_y = x - self.width // 2, y - self.height // 2
+            margin_x, margin_y = self.width // 2, self.height // 2
+        else:
+            start_x, start_y = self.viewport.x, self.viewport.y
+            margin_x = margin_y = self.margin
+
+        start_x, width = _follow(start_x, self.width, x, margin_x, bound_x)
+        start_y, height = _follow(start_y, self.height, y, margin_y, bound_y)
+        self.viewport = Viewport(start_x, start_y, width, height)
+        return self.viewport
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import random
+
+from .cell import Cell, CellType, Point, CardinalDirection, HALLWAY_FLAGS
+from .grid import CellView, CompactGrid, HALLWAY_SHIFT
+from .maze import Maze, Size
+from .viewport import Viewport
+from .algorithms import GenerationAlgorithm
+
+__all__ = ("World",)
+
+
+class World:
+    """An infinite maze, split into chunks that are generated on demand.
+
+    Every chunk is a compact :class:`Maze` generated from a seed derived
+    from the world seed and the chunk coordinates, so a chunk is always
+    generated the same way. Neighbouring chunks are joined by one door per
+    side, which both chunks derive from the same seed. Only the most
+    recently used ``max_chunks`` chunks are kept in memory.
+
+    Coordinates are global and may be negative. Chunk ``(cx, cy)`` covers
+    the logical tiles ``cx * chunk_size.width`` to ``(cx + 1) * chunk_size.width - 1``
+    and the same for ``y``. The infinite world has no end point.
+
+    chunk_size: Size
+        The size in tiles of every chunk.
+    seed: int | None
+        The seed of the world. Defaults to a random one.
+    max_chunks: int
+        The amount of chunks kept in memory. Must be at least 9.
+    algorithm: str | GenerationAlgorithm
+        The algorithm used to generate every chunk. See :meth:`Maze.generate`.
+    margin: int
+        How close to the edge of a chunk, in tiles, the player must be for
+        the chunk behind that edge to be generated.
+    """
+
+    def __init__(
+        self,
+        chunk_size: Size = Size(16, 16),
+        *,
+        seed: int | None = None,
+        max_chunks: int = 64,
+        algorithm: str | GenerationAlgorithm = "dfs",
+        margin: int = 4,
+    ):
+        if max_chunks < 9:
+            raise ValueError("max_chunks must be at least 9.")
+
+        self.chunk_size = chunk_size
+        self.seed: int = random.getrandbits(64) if seed is None else seed
+        self.max_chunks = max_chunks
+        self.algorithm = algorithm
+        self.margin = margin
+
+        # Every chunk spans its actual size plus one seam column and row,
+        # where the doors towards the next chunks are.
+        self._period = Size(chunk_size.width * 2, chunk_size.height * 2)
+        self._chunks: OrderedDict[tuple[int, int], Maze] = OrderedDict()
+
+        self.start = Point(0, 0)
+        self.end: Point | None = None
+
+    def _door(self, cx: int, cy: int, direction: CardinalDirection) -> int:
+        """The logical position, along the edge, of the door on the ``E`` or ``S`` side of a chunk."""
+        length = self.chunk_size.height if direction == "E" else self.chunk_size.width
+        return random.Random(hash((self.seed, cx, cy, direction == "E"))).randrange(length)
+
+    def _generate_chunk(self, cx: int, cy: int) -> Maze:
+        width, height = self.chunk_size
+
+        chunk = Maze(self.chunk_size, compact=True, rng=random.Random(hash((self.seed, cx, cy))))
+        chunk.generate(self.algorithm)
+
+        # Chunks have no start or end of their own.
+        chunk.start.set(chunk, CellType.tile)
+        chunk.end.set(chunk, CellType.tile)
+
+        doors: list[tuple[int, int, CardinalDirection]] = [
+            (width - 1, self._door(cx, cy, "E"), "E"),
+            (0, self._door(cx - 1, cy, "E"), "W"),
+            (self._door(cx, cy, "S"), height - 1, "S"),
+            (self._door(cx, cy - 1, "S"), 0, "N"),
+        ]
+        for x, y, direction in doors:
+            cell = chunk.cell_at(x * 2, y * 2)
+            if cell:
+                cell.hallways[direction] = True
+
+        return chunk
+
+    def chunk(self, cx: int, cy: int) -> Maze:
+        """Returns the chunk at the given chunk coordinates, generating it if needed."""
+        key = (cx, cy)
+        try:
+            self._chunks.move_to_end(key)
+            return self._chunks[key]
+        except KeyError:
+            pass
+
+        chunk = self._chunks[key] = self._generate_chunk(cx, cy)
+        while len(self._chunks) > self.max_chunks:
+            self._chunks.popitem(last=False)
+        return chunk
+
+    @property
+    def loaded_chunks(self) -> list[tuple[int, int]]:
+        """The coordinates of the chunks in memory, from least to most recently used."""
+        return list(self._chunks)
+
+    def cell_at(self, x: int, y: int) -> Cell:
+        """Returns the cell at the given global actual coordinates."""
+        period_x, period_y = self._period
+        cx, local_x = divmod(x, period_x)
+        cy, local_y = divmod(y, period_y)
+        point = Point(x, y, is_actual=True)
+
+        seam_x = local_x == period_x - 1
+        seam_y = local_y == period_y - 1
+
+        if not seam_x and not seam_y:
+            grid = self.chunk(cx, cy).grid
+            assert isinstance(grid, CompactGrid)
+            return CellView(self, grid.data, local_y * grid.width + local_x, point)
+
+        # Seams are not stored, they only hold the corridors between two doors.
+        data = bytearray([CellType.wall.value])
+        if seam_x and not seam_y and local_y % 2 == 0 and self._door(cx, cy, "E") == local_y // 2:
+            data[0] = CellType.tile.value | (HALLWAY_FLAGS["E"] | HALLWAY_FLAGS["W"]) << HALLWAY_SHIFT
+        elif seam_y and not seam_x and local_x % 2 == 0 and self._door(cx, cy, "S") == local_x // 2:
+            data[0] = CellType.tile.value | (HALLWAY_FLAGS["N"] | HALLWAY_FLAGS["S"]) << HALLWAY_SHIFT
+        return CellView(self, data, 0, point)
+
+    def type_codes(self, viewport: Viewport) -> list[bytes]:
+        """The :class:`CellType` value of every cell inside ``viewport``, one row per item.
+
+        Generates the chunks in view that are not loaded. See :meth:`Maze.type_codes`."""
+        period_x, period_y = self._period
+        rows: list[bytes] = []
+
+        for y in range(viewport.y, viewport.y + viewport.height):
+            cy, local_y = divmod(y, period_y)
+            row = bytearray()
+            x, end = viewport.x, viewport.x + viewport.width
+
+            while x < end:
+                cx, local_x = divmod(x, period_x)
+                if local_x == period_x - 1 or local_y == period_y - 1:
+                    row.append(self.cell_at(x, y).type.value)
+                    x += 1
+                    continue
+
+                # The rest of the row of this chunk, in one slice.
+                grid = self.chunk(cx, cy).grid
+                assert isinstance(grid, CompactGrid)
+                width = min(end - x, grid.width - local_x)
+                row += grid.type_codes(Viewport(local_x, local_y, width, 1))[0]
+                x += width
+
+            rows.append(bytes(row))
+        return rows
+
+    def visit(self, point: Point):
+        """Marks the chunk of ``point`` as in use, and generates the chunks
+        next to it when ``point`` is within :attr:`margin` tiles of their edge."""
+        x, y = point.actual()
+        cx, local_x = divmod(x // 2, self.chunk_size.width)
+        cy, local_y = divmod(y // 2, self.chunk_size.height)
+
+        dx = -1 if local_x < self.margin else 1 if local_x >= self.chunk_size.width - self.margin else 0
+        dy = -1 if local_y < self.margin else 1 if local_y >= self.chunk_size.height - self.margin else 0
+
+        if dx:
+            self.chunk(cx + dx, cy)
+        if dy:
+            self.chunk(cx, cy + dy)
+        if dx and dy:
+            self.chunk(cx + dx, cy + dy)
+
+        self.chunk(cx, cy)
@@ -1,15 +1,86 @@
 from textual.app import App, ComposeResult
 
-from textual.widgets import Header, Static, Footer, Placeholder
-from textual.containers import Horizontal, Vertical
-from rich_pixels import Pixels
-
+from textual.cache import LRUCache
+from textual.geometry import Region, Size as TextualSize
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.widgets import Header, Static, Placeholder
+from textual.containers import Horizontal
+from rich.segment import Segment
+
+from maze import Camera, Maze, Player, Size, Viewport
 from maze.cell import CardinalDirection
 
 
-class Map(Static):
-    def compose(self):
-        yield Placeholder("Map")
+class Map(ScrollView):
+    """The full visibility map of a maze, rendered line by line.
+
+    Only the lines on screen are rendered, so the size of the maze does not
+    matter. Lines are cached and a move only renders again the lines of the
+    player before and after it. Every cell takes two columns.
+    """
+
+    def __init__(self, player: Player, *, cache_size: int = 1024, **kwargs):
+        super().__init__(**kwargs)
+        self.player = player
+        self.maze: Maze = player.maze  # type: ignore
+        width, height = self.maze._actual_size
+        self.virtual_size = TextualSize(width * 2, height)
+        self.camera = Camera(1, 1, bounds=self.maze._actual_size)
+        self._lines: LRUCache[int, Strip] = LRUCache(cache_size)
+        self._theme = player.theme
+        self._player_y = player.cell.coord.actual()[1]
+
+    def _line(self, y: int) -> Strip:
+        """The whole line ``y`` of the maze."""
+        theme = self.player.theme
+        if theme != self._theme:
+            self._lines.clear()
+            self._theme = theme
+
+        strip = self._lines.get(y)
+        if strip is None:
+            width = self.maze._actual_size.width
+            row = list(map(theme.compile().__getitem__, self.maze.type_codes(Viewport(0, y, width, 1))[0]))
+            for point, character in (
+                (self.maze.start, theme.start),
+                (self.maze.end, theme.end),
+                (self.player.cell.coord, theme.player),
+            ):
+                point_x, point_y = point.actual()
+                if point_y == y:
+                    row[point_x] = character
+
+            strip = Strip([Segment("".join(row))], width * 2)
+            self._lines.set(y, strip)
+        return strip
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        y += scroll_y
+        if y >= self.maze._actual_size.height:
+            return Strip.blank(self.size.width, self.rich_style)
+        return self._line(y).crop(scroll_x, scroll_x + self.size.width)
+
+    def on_resize(self):
+        self.camera.resize(self.size.width // 2, self.size.height)
+        self.follow()
+
+    def follow(self):
+        """Scrolls to keep the player in view."""
+        viewport = self.camera.follow(self.player.cell.coord)
+        self.scroll_to(viewport.x * 2, viewport.y, animate=False)
+
+    def moved(self):
+        """Renders again the lines that changed after a move of the player."""
+        _, scroll_y = self.scroll_offset
+        _, y = self.player.cell.coord.actual()
+
+        for line in {self._player_y, y}:
+            self._lines.discard(line)
+            self.refresh(Region(0, line - scroll_y, self.size.width, 1))
+        self._player_y = y
+        self.follow()
 
 
 class CurrentRoom(Static):
@@ -21,16 +92,23 @@ class MazeGame(App):
     BINDINGS = [("w", "w"), ("a", "a"), ("s", "s"), ("d", "d")]
     CSS_PATH = "this.tcss"
 
+    def __init__(self, maze: Maze | None = None):
+        super().__init__()
+        if maze is None:
+            maze = Maze(Size(100, 100))
+            maze.generate()
+        self.player = Player(maze)
+
     def compose(self):
         yield Header(show_clock=True)
         yield Horizontal(
             CurrentRoom(),
-            Map(),
+            Map(self.player),
         )
 
     def move(self, direction: CardinalDirection):
-        st = self.query_one(Static)
-        st.update(f"{direction} {repr(st.size)}")
+        self.player.move(direction)
+        self.query_one(Map).moved()
 
     def action_w(self):
         self.move("N")
@@ -45,4 +123,5 @@ class MazeGame(App):
         self.move("E")
 
 
-MazeGame().run()
+if __name__ == "__main__":
+    MazeGame().run()